@@ -6,6 +6,7 @@ python -m app_voice_assistant
 """
 
 import asyncio
+import contextlib
 import logging
 
 import fastapi
@@ -14,9 +15,10 @@ from fastapi import responses
 from twilio.twiml import voice_response
 
 from constants import voice_assistant_constants
-from utils import data_utils, google_docs_utils, onboarding_utils
+from utils import api_utils, google_docs_utils, onboarding_utils
 from utils.speech_processing import audio_streaming_utils
 from voice_assistant_modules import (
+    caller_prefetch,
     default_audio_responses,
     handle_human_ai_conversation,
 )
@@ -27,7 +29,24 @@ from voice_assistant_modules.conversation_flows import (
 
 UserJourneyStage = onboarding_utils.UserJourneyStage
 
-app = fastapi.FastAPI()
+
+@contextlib.asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    """Prepares the server before serving calls."""
+    prewarm_task = None
+    if voice_assistant_constants.PREWARM_AUDIO_CACHE:
+        # Render default responses in background to keep startup fast.
+        prewarm_task = asyncio.create_task(
+            default_audio_responses.prewarm_default_responses()
+        )
+    yield
+    if prewarm_task is not None:
+        prewarm_task.cancel()
+    api_utils.close_http_clients()
+    await api_utils.close_async_http_clients()
+
+
+app = fastapi.FastAPI(lifespan=lifespan)
 
 
 @app.get("/", response_class=responses.JSONResponse)
@@ -49,6 +68,9 @@ async def handle_incoming_call(request: fastapi.Request):
     )
     logging.info(f"Incoming call from {phone_number}.")
 
+    # Load caller data while twilio connects the media stream.
+    caller_prefetch.start_prefetch(phone_number=phone_number)
+
     # Send TwiML response to start websocket connection to receive and send
     # audio.
     host = request.url.hostname
@@ -69,12 +91,13 @@ async def handle_incoming_audio_stream(
         await websocket.accept()
         logging.info(f"Websocket connection established with {phone_number}.")
 
-        # Check user's state in onboarding journey.
-        user_journey_state: UserJourneyStage = (
-            onboarding_utils.detect_user_journey_state(
-                phone_number=phone_number
-            )
+        # Get user's doc and state in onboarding journey, prefetched when
+        # the call came in.
+        caller_data = await caller_prefetch.get_caller_data(
+            phone_number=phone_number
         )
+        document_context = caller_data.document_context
+        user_journey_state: UserJourneyStage = caller_data.user_journey_state
         logging.info(f"Current state of user is : {user_journey_state.name}")
 
         # Get the stream id and set in state
@@ -106,22 +129,11 @@ async def handle_incoming_audio_stream(
                     stream_sid=stream_id,
                     target_language_code=voice_assistant_constants.DEFAULT_AI_LANGUAGE,
                 )
-                # Load list of questions
-                questionnaire = data_utils.load_json_from_disk(
-                    filepath=voice_assistant_constants.ADVISOR_QUESTIONNAIRE_PATH
-                )
                 # Initiate llm based conversation handler
-                creds, docs_service, drive_service = (
-                    google_docs_utils.get_google_doc_creds()
-                )
-                doc_id = data_utils.get_doc_by_phone(phone_number=phone_number)
-                doc_content = google_docs_utils.get_doc_as_md(
-                    doc_id=doc_id, drive_service=drive_service
-                )
                 conversation_flow_handler = (
                     advisor_questionnaire.AdvisorQuestionnaireConversation(
-                        questionnaire=questionnaire,
-                        aa_summary=doc_content,
+                        questionnaire=caller_data.questionnaire,
+                        aa_summary=document_context.markdown_content,
                     )
                 )
                 conversation_flow_handler.add_ai_message(
@@ -136,8 +148,12 @@ async def handle_incoming_audio_stream(
                 )
                 # Save the human response summary to google doc.
                 if conversation_flow_handler.is_conversation_ended():
+                    _, docs_service, _ = (
+                        google_docs_utils.get_google_doc_creds()
+                    )
                     conversation_flow_handler.save_answer_to_doc(
-                        doc_id=doc_id, creds=creds, docs_service=docs_service
+                        doc_id=document_context.doc_id,
+                        docs_service=docs_service,
                     )
                 await asyncio.sleep(5)
                 await websocket.close()  # Hang the call
@@ -163,14 +179,11 @@ async def handle_incoming_audio_stream(
                     target_language_code=voice_assistant_constants.DEFAULT_AI_LANGUAGE,
                 )
                 # Initiate llm based conversation handler
-                _, _, drive_service = google_docs_utils.get_google_doc_creds()
-                doc_id = data_utils.get_doc_by_phone(phone_number=phone_number)
-                doc_content = google_docs_utils.get_doc_as_md(
-                    doc_id=doc_id, drive_service=drive_service
-                )
                 conversation_flow_handler = (
                     advice_explanation.AdviceExplanationConversation(
-                        customer_profile_and_advice=doc_content
+                        customer_profile_and_advice=(
+                            document_context.markdown_content
+                        )
                     )
                 )
                 conversation_flow_handler.add_ai_message(
@@ -0,0 +1,21 @@
+"""Constants used by the shared HTTP clients."""
+
+# Timeouts of HTTP requests
+CONNECT_TIMEOUT_SEC = 5
+READ_TIMEOUT_SEC = 60
+WRITE_TIMEOUT_SEC = 30
+POOL_TIMEOUT_SEC = 30  # Max wait for a free connection of a host
+
+# Connection pool of each base URL
+MAX_CONNECTIONS_PER_HOST = 16  # Also caps concurrent requests to a host
+MAX_KEEPALIVE_CONNECTIONS_PER_HOST = 8
+KEEPALIVE_EXPIRY_SEC = 30
+
+# Retries of failed requests
+RETRY_BASE_DELAY_SEC = 0.5  # Max delay before first retry, doubled after
+RETRY_MAX_DELAY_SEC = 8
+REQUEST_DEADLINE_SEC = 90  # Max time of a call including all retries
+
+# Circuit breaker of each base URL
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures to stop calling a host
+CIRCUIT_RESET_TIMEOUT_SEC = 30  # Time after which a trial call is allowed
@@ -4,6 +4,9 @@ DOC_TITLE_PREFIX = "Cusp Money Client"
 
 ADVISOR_EMAIL = "hetul@infocusp.com"
 
+DOC_CACHE_TTL_SEC = 30  # Reuse doc exports without checking for changes
+DOC_CACHE_MAX_DOCS = 64  # Least recently used doc exports are evicted
+
 AA_SUMMARY_HEADING = "Account Aggregator Summary"
 
 AA_SUMMARY_DESCRIPTION = (
@@ -1,3 +1,4 @@
 """Constants used during onboarding process."""
 
 CUSP_PHONE_NUMBER = "+1 505 484 2085"
+ANALYSIS_MAX_WORKERS = 8  # Threads to analyse accounts data concurrently
@@ -1,4 +1,8 @@
-"""Constants used by Sahamati Rahasya APIs."""
+"""Constants used by Sahamati Rahasya encryption."""
 
-# Started using : docker run -p 8888:8080 gsasikumar/forwardsecrecy:V1.2
-HOST = "http://localhost:8888"
+# Validity of generated ECC key pairs. Keys are used for a single FI request.
+KEY_EXPIRY_DAYS = 1
+
+# Ephemeral key pairs kept ready for FI requests.
+KEY_POOL_SIZE = 8
+KEY_POOL_TTL_SEC = 600  # Unused key pairs are discarded after this time
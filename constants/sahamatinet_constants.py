@@ -9,8 +9,13 @@ USER_NAME = "hetul@infocusp.com"
 PASSWORD = ""
 
 # Data fetch config
-MAX_TRIALS = 3
-DELAY_FOR_RETRY = 1
+MAX_TRIALS = 6
+DELAY_FOR_RETRY = 1  # Delay before the first retry, doubled for each retry
+RETRY_BACKOFF_MULTIPLIER = 2
+MAX_DELAY_FOR_RETRY = 8
+FI_FETCH_MAX_WAIT_SEC = 30  # Max time to wait for data of an FI session
+FI_FETCH_MAX_CONCURRENCY = 8  # Max SahamatiNet/Rahasya calls in flight
+FIP_MAX_CALLS_PER_SEC = 2  # Max calls per second to a single FIP
 
 # Load private key used for generating detached jws
 RSA_PRIVATE_KEY_JWK = data_utils.load_json_from_disk(
@@ -15,6 +15,8 @@ RATE = 8000  # Hz
 # Voice activity config
 VAD_FRAMES_PER_BUFFER = int(RATE * 0.03)  # Detect speech for given audio chunk
 IDLE_TIME_TRIGGER_SEC = 0.5  # Max pause to trigger speech processing
+VAD_HANGOVER_SEC = 0.15  # Short pauses within speech are treated as speech
+BARGE_IN_MIN_SPEECH_SEC = 0.3  # Caller speech needed to interrupt AI audio
 VAD_MODE = 3  # Refer https://docs.rs/webrtc-vad/latest/src/webrtc_vad/lib.rs.html#125-133
 
 
@@ -23,11 +25,38 @@ SARVAM_BASE_URL = "https://api.sarvam.ai/"
 DEFAULT_AI_LANGUAGE = "hi-IN"
 SARVAM_API_KEY = ""
 SPEECH_PROCESSING_MIN_BYTES = 1000  # Minimum bytes for processing speech
+MAX_UTTERANCE_SEC = 30  # Only latest audio of longer utterances is processed
+SPEECH_PROCESSING_MAX_WORKERS = 32  # Threads for blocking STT, LLM and TTS
+STREAM_TTS_PLAYBACK = True  # Play each sentence as soon as it is synthesised
+MAX_TRACKED_TURN_LATENCIES = 100  # Latencies of recent turns kept per call
 RECORDINGS_DIR = "data/recordings"
+SUPPORTED_LANGUAGES = (
+    "en-IN",
+    "hi-IN",
+    "bn-IN",
+    "gu-IN",
+    "kn-IN",
+    "ml-IN",
+    "mr-IN",
+    "od-IN",
+    "pa-IN",
+    "ta-IN",
+    "te-IN",
+)
+TTS_SPEAKER = "meera"
+TTS_PITCH = 0
+TTS_PACE = 1.1
+TTS_LOUDNESS = 1.5
+TTS_MODEL = "bulbul:v1"
+TRANSLATION_MODEL = "mayura:v1"
+TRANSLATION_MODE = "code-mixed"
+AUDIO_CACHE_DIR = "data/audio_cache"  # Rendered audio of default responses
+PREWARM_AUDIO_CACHE = True  # Render default responses on server startup
 
 
 # Conversation flows config
 ADVISOR_QUESTIONNAIRE_PATH = "data/voice_assistant/advisor_questionnaire.json"
+CALLER_PREFETCH_TTL_SEC = 60  # Drop prefetched caller data if no stream
 
 
 # Default responses
@@ -61,3 +90,10 @@ NOTIFY_AGENDA_OF_QA_OVER_ADVICE = (
     "now. Would you like a brief overview first, or do you already "
     "have some questions in mind?"
 )
+
+DEFAULT_RESPONSES = (
+    NOTIFY_ONBOARDING_PENDING,
+    NOTIFY_AGENDA_OF_QUESTIONNAIRE,
+    NOTIFY_ADVICE_PENDING,
+    NOTIFY_AGENDA_OF_QA_OVER_ADVICE,
+)
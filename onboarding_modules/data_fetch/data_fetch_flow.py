@@ -9,6 +9,7 @@ from onboarding_modules.data_fetch import (
     show_consent_used_for_data_fetch,
 )
 from onboarding_modules.login_signup import sahamatinet_login_flow
+from utils.sahamati import ephemeral_key_pool
 
 
 def fetch_accounts_data(
@@ -16,6 +17,9 @@ def fetch_accounts_data(
 ) -> Optional[list[dict]]:
     """Shows consent being used and fetch accounts data."""
     data = []
+    # Generate keys for FI requests while the user reviews the consent.
+    ephemeral_key_pool.get_key_pool()
+
     # Show the consent being used
     linked_acc_data = show_consent_used_for_data_fetch.show_active_consent(
         consent_handle=consent_handle,
@@ -25,7 +29,7 @@ def fetch_accounts_data(
         return None
     accounts_linked_with_consent, allowed_fetch_duration = linked_acc_data
 
-    # Fetch data for each account one by one
+    # Fetch data for all accounts concurrently
     if "sahamatinet_member_token" not in st.session_state:
         if not sahamatinet_login_flow.login_to_sahamatinet():
             st.error("Could not connect to SahamatiNet at the moment.")
@@ -1,10 +1,12 @@
 """Submodule to handle account summary generation."""
 
+import concurrent.futures
+import logging
 from typing import Any
 
 import streamlit as st
 
-from constants import customer_profile_doc
+from constants import customer_profile_doc, onboarding_flow_constants
 from utils import api_utils, data_utils, google_docs_utils
 from utils.fi_data_analysis import fi_data_analysis_utils
 from utils.fi_data_analysis.fi_data_analyzers import base_analyzer
@@ -13,9 +15,7 @@ from utils.fi_data_analysis.fi_data_analyzers import base_analyzer
 def get_new_doc_to_add_analysis(phone_number: str):
     """Creates a new google doc template for adding analysis."""
     # Create a new doc to store analysis.
-    creds, docs_service, drive_service = (
-        google_docs_utils.get_google_doc_creds()
-    )
+    _, docs_service, drive_service = google_docs_utils.get_google_doc_creds()
 
     doc_id = google_docs_utils.create_new_google_doc(
         docs_service=docs_service,
@@ -41,55 +41,100 @@ def get_new_doc_to_add_analysis(phone_number: str):
     )
 
     # Add a heading and description.
-    google_docs_utils.write_heading_to_google_doc(
-        doc_id=doc_id,
-        docs_service=docs_service,
-        heading=customer_profile_doc.AA_SUMMARY_HEADING,
-        heading_level=1,
+    doc_builder = google_docs_utils.GoogleDocBuilder(
+        doc_id=doc_id, docs_service=docs_service
     )
-    google_docs_utils.write_title_to_google_doc(
-        doc_id=doc_id,
-        docs_service=docs_service,
-        title=customer_profile_doc.AA_SUMMARY_DESCRIPTION,
+    doc_builder.add_heading(
+        heading=customer_profile_doc.AA_SUMMARY_HEADING, heading_level=1
     )
+    doc_builder.add_title(title=customer_profile_doc.AA_SUMMARY_DESCRIPTION)
+    doc_builder.flush()
     return doc_id
 
 
-def add_summary_to_doc(
-    account_id: str,
-    account_data: list[dict],
-    doc_id: str,
-    status_handle: Any,
-):
-    """Adds analysis summary to google doc for data of given fi_type."""
-    fi_type, xml_data = account_data["fiType"], account_data["fiData"]
+def analyse_account(
+    account_data: dict, doc_builder: google_docs_utils.GoogleDocBuilder
+) -> bool:
+    """Adds analysis summary of an account to given doc builder.
 
-    status_handle.update(
-        label=f"Analyzing data for {account_id}...",
-        state="running",
-    )
+    Returns:
+        False if data of the account type can not be analysed.
+    """
+    fi_type, xml_data = account_data["fiType"], account_data["fiData"]
 
-    # Load suitable analyse for fi type and save results.
+    # Load suitable analyser for fi type and add the summary.
     analyse_and_save_fi_data: base_analyzer.FiDataAnalyzerBase = (
         fi_data_analysis_utils.get_fi_analysis_handler(fi_type=fi_type)
     )
-
     if analyse_and_save_fi_data is None:
-        display_str = f"Failed to analyse {account_id} at this moment."
-        status_handle.update(label=display_str, state="running")
+        return False
 
-    # Get creds and update google doc with analysis.
-    creds, docs_service, _ = google_docs_utils.get_google_doc_creds()
     analyse_and_save_fi_data().write_summary_to_doc(
-        xml_data=xml_data,
-        creds=creds,
-        docs_service=docs_service,
-        document_id=doc_id,
+        xml_data=xml_data, doc_builder=doc_builder
     )
+    return True
 
-    display_str = f"Analyzed data for {account_id} successfully"
-    status_handle.update(label=display_str, state="running")
-    st.success(display_str)
+
+def add_summaries_to_doc(
+    accounts_data: list[dict],
+    doc_id: str,
+    status_handle: Any,
+):
+    """Analyses all accounts concurrently and adds summaries to google doc."""
+    accounts = [
+        next(iter(account_info.items())) for account_info in accounts_data
+    ]
+    _, docs_service, _ = google_docs_utils.get_google_doc_creds()
+    doc_builders = [
+        google_docs_utils.GoogleDocBuilder(
+            doc_id=doc_id, docs_service=docs_service
+        )
+        for _ in accounts
+    ]
+
+    # Analyse all accounts concurrently. Analysers only fill the builders
+    # and streamlit is updated from this thread only.
+    status_handle.update(
+        label=f"Analyzing data for {len(accounts)} accounts...",
+        state="running",
+    )
+    is_analysed = [False] * len(accounts)
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=onboarding_flow_constants.ANALYSIS_MAX_WORKERS
+    ) as executor:
+        futures = {
+            executor.submit(
+                analyse_account,
+                account_data=account_data,
+                doc_builder=doc_builder,
+            ): index
+            for index, ((_, account_data), doc_builder) in enumerate(
+                zip(accounts, doc_builders)
+            )
+        }
+        for future in concurrent.futures.as_completed(futures):
+            index = futures[future]
+            account_id = accounts[index][0]
+            try:
+                is_analysed[index] = future.result()
+            except Exception as e:
+                logging.error(f"Error while analysing {account_id}: {e}")
+            if is_analysed[index]:
+                st.write(f"Analyzed data for {account_id}.")
+            else:
+                st.warning(f"Failed to analyse {account_id} at this moment.")
+
+    # Write summaries to the doc in order of accounts.
+    for (account_id, _), doc_builder, is_account_analysed in zip(
+        accounts, doc_builders, is_analysed
+    ):
+        if not is_account_analysed:
+            continue
+        status_handle.update(
+            label=f"Saving summary of {account_id}...", state="running"
+        )
+        doc_builder.flush()
+        st.success(f"Analyzed data for {account_id} successfully")
 
 
 def generate_summary_of_accounts(phone_number: str, accounts_data: list):
@@ -113,14 +158,11 @@ def generate_summary_of_accounts(phone_number: str, accounts_data: list):
 
         # Add summary for different types of financial accounts such as
         # deposits, mutual funds and policies etc.
-        for account_info in accounts_data:
-            account_id, accounts_data = next(iter(account_info.items()))
-            add_summary_to_doc(
-                account_id=account_id,
-                account_data=accounts_data,
-                doc_id=doc_id,
-                status_handle=analysis_status,
-            )
+        add_summaries_to_doc(
+            accounts_data=accounts_data,
+            doc_id=doc_id,
+            status_handle=analysis_status,
+        )
 
         data_utils.save_locally(phone_number=phone_number, doc_id=doc_id)
         analysis_status.update(
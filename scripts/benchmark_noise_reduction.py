@@ -0,0 +1,65 @@
+"""Benchmarks streaming noise reduction against per-frame noisereduce.
+
+Sample command:
+
+python -m scripts.benchmark_noise_reduction
+"""
+
+import logging
+import time
+
+import numpy as np
+
+from constants import voice_assistant_constants
+from utils.speech_processing import audio_streaming_utils, noise_reduction
+
+CALL_DURATION_SEC = 10
+
+
+def get_noisy_call_audio() -> np.ndarray:
+    """Generates a noisy tone to simulate caller audio."""
+    rate = voice_assistant_constants.RATE
+    timestamps = np.arange(rate * CALL_DURATION_SEC) / rate
+    tone = np.sin(2 * np.pi * 440 * timestamps) * 8000
+    noise = np.random.default_rng(seed=0).normal(scale=500, size=len(tone))
+    return (tone + noise).astype(np.int16)
+
+
+def split_into_frames(audio: np.ndarray) -> list[bytes]:
+    """Splits audio into 20 ms frames as received from twilio."""
+    frame_size = voice_assistant_constants.CHUNK_LENGTH
+    return [
+        audio[start : start + frame_size].tobytes()
+        for start in range(0, len(audio), frame_size)
+    ]
+
+
+def measure_cpu_per_call_second(reduce_noise, frames: list[bytes]) -> float:
+    """Measures cpu time in ms spent per second of call audio."""
+    start_time = time.process_time()
+    for frame in frames:
+        reduce_noise(frame)
+    duration = (time.process_time() - start_time) * 1000  # ms
+    return duration / CALL_DURATION_SEC
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.INFO)
+
+    frames = split_into_frames(audio=get_noisy_call_audio())
+
+    per_frame_cpu = measure_cpu_per_call_second(
+        reduce_noise=lambda frame: (
+            audio_streaming_utils.reduce_noise_from_audio(
+                raw_audio_bytes=frame
+            )
+        ),
+        frames=frames,
+    )
+    logging.info(f"Per-frame noisereduce: {per_frame_cpu:.2f} ms/call-sec.")
+
+    denoiser = noise_reduction.StreamingDenoiser()
+    streaming_cpu = measure_cpu_per_call_second(
+        reduce_noise=denoiser.process, frames=frames
+    )
+    logging.info(f"Streaming denoiser: {streaming_cpu:.2f} ms/call-sec.")
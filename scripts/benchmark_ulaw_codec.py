@@ -0,0 +1,74 @@
+"""Benchmarks lookup table based µ-law codec against audioop.
+
+`audioop` is removed in Python 3.13, its numbers are skipped when missing.
+
+Sample command:
+
+python -m scripts.benchmark_ulaw_codec
+"""
+
+import base64
+import logging
+import timeit
+
+import numpy as np
+
+from constants import voice_assistant_constants
+from utils.speech_processing import audio_streaming_utils
+
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+BUFFER_DURATIONS_SEC = [0.02, 10]
+NUM_RUNS = 200
+
+
+def measure_us_per_call(func) -> float:
+    """Measures average time taken by func in microseconds."""
+    return timeit.timeit(func, number=NUM_RUNS) / NUM_RUNS * 1e6
+
+
+def benchmark_buffer(duration_sec: float):
+    """Benchmarks encoding and decoding of given duration of audio."""
+    num_samples = int(voice_assistant_constants.RATE * duration_sec)
+    pcm_audio = (
+        np.random.default_rng(seed=0)
+        .integers(-32768, 32767, size=num_samples, dtype=np.int16)
+        .tobytes()
+    )
+    ulaw_payload = audio_streaming_utils.convert_to_ulaw(
+        raw_audio_bytes=pcm_audio
+    )
+
+    results = {
+        "numpy encode": measure_us_per_call(
+            lambda: audio_streaming_utils.convert_to_ulaw(
+                raw_audio_bytes=pcm_audio
+            )
+        ),
+        "numpy decode": measure_us_per_call(
+            lambda: audio_streaming_utils.decode_ulaw_payload(
+                ulaw_audio=ulaw_payload
+            )
+        ),
+    }
+    if audioop:
+        width = voice_assistant_constants.BYTES_PER_SAMPLE
+        results["audioop encode"] = measure_us_per_call(
+            lambda: base64.b64encode(audioop.lin2ulaw(pcm_audio, width))
+        )
+        results["audioop decode"] = measure_us_per_call(
+            lambda: audioop.ulaw2lin(base64.b64decode(ulaw_payload), width)
+        )
+
+    for name, duration in results.items():
+        logging.info(f"{duration_sec} sec buffer, {name}: {duration:.2f} us.")
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.INFO)
+
+    for duration_sec in BUFFER_DURATIONS_SEC:
+        benchmark_buffer(duration_sec=duration_sec)
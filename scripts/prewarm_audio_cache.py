@@ -0,0 +1,35 @@
+"""Renders default audio responses into the on disk audio cache.
+
+Sample command:
+
+python -m scripts.prewarm_audio_cache --languages hi-IN en-IN
+"""
+
+import argparse
+import asyncio
+import logging
+
+from constants import voice_assistant_constants
+from voice_assistant_modules import default_audio_responses
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--languages",
+        nargs="+",
+        default=voice_assistant_constants.SUPPORTED_LANGUAGES,
+        help="Language codes to render default responses in.",
+    )
+    args = parser.parse_args()
+
+    num_cached = asyncio.run(
+        default_audio_responses.prewarm_default_responses(
+            languages=args.languages
+        )
+    )
+    expected = len(args.languages) * len(
+        voice_assistant_constants.DEFAULT_RESPONSES
+    )
+    if num_cached < expected:
+        logging.error(f"Failed to render {expected - num_cached} responses.")
@@ -1,72 +1,348 @@
 """Helper library for API handling."""
 
+import asyncio
 import base64
 import datetime
 import json
 import logging
+import threading
 import time
 import uuid
-from typing import Any, Optional
+import weakref
+from typing import Any, Optional, Union
 
-import requests
+import httpx
 from joserfc.jwk import RSAKey
 from joserfc.rfc7797 import serialize_compact
 
+from constants import api_constants
+from utils import http_retry_utils
+
+HTTP_TIMEOUT = httpx.Timeout(
+    connect=api_constants.CONNECT_TIMEOUT_SEC,
+    read=api_constants.READ_TIMEOUT_SEC,
+    write=api_constants.WRITE_TIMEOUT_SEC,
+    pool=api_constants.POOL_TIMEOUT_SEC,
+)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=api_constants.MAX_CONNECTIONS_PER_HOST,
+    max_keepalive_connections=api_constants.MAX_KEEPALIVE_CONNECTIONS_PER_HOST,
+    keepalive_expiry=api_constants.KEEPALIVE_EXPIRY_SEC,
+)
+
+# Clients by base url, shared by all threads. Each client keeps a pool of
+# keep-alive connections to its host.
+_http_clients: dict[str, httpx.Client] = {}
+_http_clients_lock = threading.Lock()
+
+# Async clients can only be used within the event loop they were created in,
+# so they are kept by event loop and then by base url.
+_async_http_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]
+] = weakref.WeakKeyDictionary()
+
+
+def get_http_client(base_url: str) -> httpx.Client:
+    """Gets the shared client for given base url, creating it once."""
+    if base_url not in _http_clients:
+        with _http_clients_lock:
+            if base_url not in _http_clients:
+                _http_clients[base_url] = httpx.Client(
+                    timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS
+                )
+    return _http_clients[base_url]
+
+
+def get_async_http_client(base_url: str) -> httpx.AsyncClient:
+    """Gets the async client of running event loop for given base url."""
+    loop = asyncio.get_running_loop()
+    clients = _async_http_clients.setdefault(loop, {})
+    if base_url not in clients:
+        clients[base_url] = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS
+        )
+    return clients[base_url]
+
+
+def close_http_clients():
+    """Closes the shared clients and their connections."""
+    with _http_clients_lock:
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+
+
+async def close_async_http_clients():
+    """Closes the async clients of running event loop."""
+    clients = _async_http_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def _encode_payload(
+    payload: Optional[Union[dict[str, Any], str, bytes]],
+) -> Optional[Union[str, bytes]]:
+    """Serialises dict payloads as compact json."""
+    if isinstance(payload, dict):
+        return json.dumps(payload, separators=(",", ":")) if payload else None
+    return payload
+
+
+def _rewind_files(files: Optional[dict[str, Any]]):
+    """Rewinds file objects so that they can be sent again on retry."""
+    for file in (files or {}).values():
+        file_object = file[1] if isinstance(file, tuple) else file
+        if hasattr(file_object, "seek"):
+            file_object.seek(0)
+
+
+class _RequestAttempts:
+    """Attempts of a request, deciding retries and tracking the host health.
+
+    Holds what the sync and async request loops share, so that they only
+    differ in how they send the request and wait before retrying.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        method: str,
+        endpoint: str,
+        headers: Optional[dict[str, str]],
+        payload: Optional[Union[dict[str, Any], str, bytes]],
+        files: Optional[dict[str, Any]],
+        retries: int,
+        retry_policy: Optional[http_retry_utils.RetryPolicy],
+    ) -> None:
+        """Initialise the attempts of a request."""
+        self.base_url = base_url
+        self.method = method
+        self.url = f"{base_url}{endpoint}"
+        self.headers = headers or {"Content-Type": "application/json"}
+        self.payload = _encode_payload(payload=payload)
+        self.files = files
+        self.retry_policy = retry_policy or http_retry_utils.RetryPolicy(
+            max_attempts=retries
+        )
+        self.circuit_breaker = http_retry_utils.get_circuit_breaker(
+            base_url=base_url
+        )
+        self.deadline = time.monotonic() + self.retry_policy.deadline_sec
+        self._start_time = 0.0
+
+    def start(self) -> Optional[dict[str, Any]]:
+        """Starts an attempt unless the circuit of the host is open.
+
+        Returns:
+            Keyword arguments of `request` of the client, or None if the
+            request must not be sent.
+        """
+        if not self.circuit_breaker.allow_request():
+            logging.error(
+                f"Circuit open for {self.base_url}, not calling {self.url}."
+            )
+            return None
+        _rewind_files(files=self.files)
+        self._start_time = time.time()  # Start timing the request
+        return {
+            "method": self.method,
+            "url": self.url,
+            "headers": self.headers,
+            "content": self.payload,
+            "files": self.files,
+            "timeout": self.retry_policy.get_timeout(deadline=self.deadline),
+        }
+
+    def _get_duration(self) -> float:
+        """Gets the duration of current attempt in ms."""
+        return (time.time() - self._start_time) * 1000
+
+    def handle_response(
+        self, response: httpx.Response, attempt: int
+    ) -> tuple[Optional[dict[str, Any]], Optional[float]]:
+        """Parses a successful response and logs failed ones.
+
+        Returns:
+            Response data if successful, and delay before retrying if the
+            request should be retried.
+        """
+        duration = self._get_duration()
+        self.circuit_breaker.record_response(status_code=response.status_code)
+        if response.is_success:
+            logging.info(
+                f"Successfully called {self.url} in {duration:.2f} ms"
+            )
+            try:
+                return response.json(), None  # Success case
+            except json.JSONDecodeError as e:
+                logging.error(f"Invalid json response from {self.url}: {e}")
+                return None, None
+
+        # Log non-2xx response but avoid raising an exception immediately
+        logging.error(
+            "Req. failed code=%d, attempt=%d for %s, error %s in %.2f ms"
+            % (
+                response.status_code,
+                attempt + 1,
+                self.url,
+                response.text,
+                duration,
+            )
+        )
+        if not self.retry_policy.is_retryable_status(
+            method=self.method, status_code=response.status_code
+        ):
+            return None, None
+        return None, self.retry_policy.get_retry_delay(
+            attempt=attempt, response=response
+        )
+
+    def handle_error(
+        self, error: httpx.HTTPError, attempt: int
+    ) -> Optional[float]:
+        """Logs a failed request and gets the delay before retrying it."""
+        logging.error(
+            "Request exception on attempt %d in %.2f ms: %s"
+            % (attempt + 1, self._get_duration(), str(error))
+        )
+        if isinstance(error, httpx.PoolTimeout):
+            # Local connection pool is exhausted, which says nothing of host.
+            self.circuit_breaker.release_trial()
+        elif isinstance(error, httpx.TransportError):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        if not self.retry_policy.is_retryable_error(
+            method=self.method, error=error
+        ):
+            return None
+        return self.retry_policy.get_retry_delay(attempt=attempt)
+
+    def abort(self):
+        """Ends an attempt which was cancelled or failed without outcome."""
+        self.circuit_breaker.release_trial()
+
+    def can_retry(self, attempt: int, retry_delay: Optional[float]) -> bool:
+        """Checks if a retry is allowed by the policy and the deadline."""
+        if (
+            retry_delay is None
+            or attempt + 1 >= self.retry_policy.max_attempts
+        ):
+            return False
+        if time.monotonic() + retry_delay >= self.deadline:
+            logging.error(f"No time left in deadline to retry {self.url}.")
+            return False
+        logging.info(f"Retrying {self.url} in {retry_delay:.2f} seconds.")
+        return True
+
 
 def make_request(
     base_url: str,
     method: str,
     endpoint: str,
     headers: Optional[dict[str, str]] = None,
-    payload: Optional[dict[str, Any]] = None,
+    payload: Optional[Union[dict[str, Any], str, bytes]] = None,
     files: Optional[dict[str, Any]] = None,
     retries: int = 3,
+    retry_policy: Optional[http_retry_utils.RetryPolicy] = None,
 ) -> Optional[dict[str, Any]]:
-    """Handles API requests."""
-    url = f"{base_url}{endpoint}"
-    headers = headers or {"Content-Type": "application/json"}
+    """Handles API requests using the shared client of base url.
 
-    if isinstance(payload, dict):
-        payload = (
-            json.dumps(payload, separators=(",", ":")) if payload else None
-        )
+    Args:
+        base_url: Base url of the API.
+        method: HTTP method of the request.
+        endpoint: Endpoint of the API relative to base url.
+        headers: Headers of the request.
+        payload: Body of the request, dicts are sent as json while str
+            and bytes are sent as is.
+        files: Files sent as multipart form data.
+        retries: Maximum attempts when no retry policy is given.
+        retry_policy: Decides which failures are retried and when.
+    """
+    attempts = _RequestAttempts(
+        base_url=base_url,
+        method=method,
+        endpoint=endpoint,
+        headers=headers,
+        payload=payload,
+        files=files,
+        retries=retries,
+        retry_policy=retry_policy,
+    )
+    client = get_http_client(base_url=base_url)
 
-    for attempt in range(retries):
-        start_time = time.time()  # Start timing the request
+    for attempt in range(attempts.retry_policy.max_attempts):
+        request_kwargs = attempts.start()
+        if request_kwargs is None:
+            return None
         try:
-            response = requests.request(
-                method,
-                url,
-                headers=headers,
-                data=payload,
-                files=files,
+            data, retry_delay = attempts.handle_response(
+                response=client.request(**request_kwargs), attempt=attempt
             )
-            duration = (time.time() - start_time) * 1000  # ms
+            if data is not None:
+                return data
+        except httpx.HTTPError as e:
+            retry_delay = attempts.handle_error(error=e, attempt=attempt)
+        except BaseException:
+            attempts.abort()
+            raise
 
-            if response.ok:
-                logging.info(f"Successfully called {url} in {duration:.2f} ms")
-                return response.json()  # Success case
+        if not attempts.can_retry(attempt=attempt, retry_delay=retry_delay):
+            break
+        time.sleep(retry_delay)
 
-            # Log non-2xx response but avoid raising an exception immediately
-            logging.error(
-                "Req. failed code=%d, attempt=%d for %s, error %s in %.2f ms"
-                % (
-                    response.status_code,
-                    attempt + 1,
-                    url,
-                    response.text,
-                    duration,
-                )
-            )
+    logging.error(f"All attempts failed for {attempts.url}.")
+    return None  # None returned in case all attempts fail
 
-        except requests.RequestException as e:
-            duration = (time.time() - start_time) * 1000  # ms
-            logging.error(
-                "Request exception on attempt %d in %.2f ms: %s"
-                % (attempt + 1, duration, str(e))
+
+async def async_make_request(
+    base_url: str,
+    method: str,
+    endpoint: str,
+    headers: Optional[dict[str, str]] = None,
+    payload: Optional[Union[dict[str, Any], str, bytes]] = None,
+    files: Optional[dict[str, Any]] = None,
+    retries: int = 3,
+    retry_policy: Optional[http_retry_utils.RetryPolicy] = None,
+) -> Optional[dict[str, Any]]:
+    """Handles API requests from event loop, same as `make_request`.
+
+    Cancelling the calling task also cancels the request in flight.
+    """
+    attempts = _RequestAttempts(
+        base_url=base_url,
+        method=method,
+        endpoint=endpoint,
+        headers=headers,
+        payload=payload,
+        files=files,
+        retries=retries,
+        retry_policy=retry_policy,
+    )
+    client = get_async_http_client(base_url=base_url)
+
+    for attempt in range(attempts.retry_policy.max_attempts):
+        request_kwargs = attempts.start()
+        if request_kwargs is None:
+            return None
+        try:
+            data, retry_delay = attempts.handle_response(
+                response=await client.request(**request_kwargs),
+                attempt=attempt,
             )
+            if data is not None:
+                return data
+        except httpx.HTTPError as e:
+            retry_delay = attempts.handle_error(error=e, attempt=attempt)
+        except BaseException:
+            attempts.abort()
+            raise
+
+        if not attempts.can_retry(attempt=attempt, retry_delay=retry_delay):
+            break
+        await asyncio.sleep(retry_delay)
 
-    logging.error("All attempts failed.")
+    logging.error(f"All attempts failed for {attempts.url}.")
     return None  # None returned in case all attempts fail
 
 
@@ -99,26 +375,29 @@ def dict_to_b64(data: dict):
     return base64.b64encode(data.encode()).decode()
 
 
-def get_detached_jws(payload: dict, private_key: dict) -> str:
-    """Generates `x-jws-signature` for given payload."""
-    # Private Key
-    private_key = RSAKey.import_key(private_key)
+class JwsSigner:
+    """Signs request bodies with detached JWS using a key imported once."""
 
-    # Headers
-    protected = {
-        "alg": private_key.alg,
-        "kid": private_key.kid,
-        "b64": False,
-        "crit": ["b64"],
-    }
+    def __init__(self, private_key: dict) -> None:
+        """Initialise the signer with a private JWK."""
+        self.private_key = RSAKey.import_key(private_key)
+        self.protected = {
+            "alg": self.private_key.alg,
+            "kid": self.private_key.kid,
+            "b64": False,
+            "crit": ["b64"],
+        }
 
-    if isinstance(payload, dict):
-        payload = (
-            json.dumps(payload, separators=(",", ":")) if payload else None
-        )
-    # Detached JWS Creation
-    value = serialize_compact(
-        protected=protected, payload=payload, private_key=private_key
-    )
+    def sign(self, payload: dict) -> tuple[bytes, str]:
+        """Serialises payload once and generates its `x-jws-signature`.
 
-    return value
+        Returns:
+            Body to send as is, and the detached JWS of exactly those bytes.
+        """
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        signature = serialize_compact(
+            protected=self.protected,
+            payload=body,
+            private_key=self.private_key,
+        )
+        return body, signature
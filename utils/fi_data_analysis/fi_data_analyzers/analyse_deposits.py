@@ -1,7 +1,6 @@
 """Analyzes deposits data and adds summary to google doc."""
 
 import xml.etree.ElementTree as ET
-from typing import Any
 
 import pandas as pd
 
@@ -211,27 +210,20 @@ class DepositsAnalyzer(base_analyzer.FiDataAnalyzerBase):
         return category_wise_summary
 
     def write_summary_to_doc(
-        self, xml_data: str, creds: Any, docs_service: Any, document_id: str
+        self, xml_data: str, doc_builder: google_docs_utils.GoogleDocBuilder
     ):
         """Writes deposits summary to doc."""
         if isinstance(xml_data, str):
             xml_data = [xml_data]
 
         # Write title and summary table to Google Doc
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=document_id,
-            docs_service=docs_service,
+        doc_builder.add_heading(
             heading="Bank accounts",
         )
         balance_table = self.extract_savings_account_balances_from_xml(
             xml_list=xml_data
         )
-        google_docs_utils.write_table_to_google_doc(
-            table_data=balance_table,
-            doc_id=document_id,
-            creds=creds,
-            docs_service=docs_service,
-        )
+        doc_builder.add_table(table_data=balance_table)
 
         # Write category wise summary to Google doc
         transactions_df = self.parse_multiple_xmls_to_df(xml_list=xml_data)
@@ -240,18 +232,11 @@ class DepositsAnalyzer(base_analyzer.FiDataAnalyzerBase):
         monthly_avg = self.calculate_avg_monthly_amounts(
             transactions_df=transactions_df
         )
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=document_id,
-            docs_service=docs_service,
+        doc_builder.add_heading(
             heading="Cash Flow Analysis",
             heading_level="3",
         )
-        google_docs_utils.write_table_to_google_doc(
-            table_data=monthly_avg,
-            doc_id=document_id,
-            creds=creds,
-            docs_service=docs_service,
-        )
+        doc_builder.add_table(table_data=monthly_avg)
 
         # Write category wise summary for credit and debit transactions.
         debit_trxn_tags, credit_trxn_tags = (
@@ -266,28 +251,14 @@ class DepositsAnalyzer(base_analyzer.FiDataAnalyzerBase):
             predictions_df=credit_trxn_tags, use_subcategory=True
         )
 
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=document_id,
-            docs_service=docs_service,
+        doc_builder.add_heading(
             heading="Debit transactions summary",
             heading_level="4",
         )
-        google_docs_utils.write_table_to_google_doc(
-            table_data=debit_summary,
-            doc_id=document_id,
-            creds=creds,
-            docs_service=docs_service,
-        )
+        doc_builder.add_table(table_data=debit_summary)
 
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=document_id,
-            docs_service=docs_service,
+        doc_builder.add_heading(
             heading="Credit transactions summary",
             heading_level="4",
         )
-        google_docs_utils.write_table_to_google_doc(
-            table_data=credit_summary,
-            doc_id=document_id,
-            creds=creds,
-            docs_service=docs_service,
-        )
+        doc_builder.add_table(table_data=credit_summary)
@@ -1,7 +1,6 @@
 """Analyzes equities data and adds summary to google doc."""
 
 import xml.etree.ElementTree as ET
-from typing import Any
 
 from utils import google_docs_utils
 from utils.fi_data_analysis.fi_data_analyzers import base_analyzer
@@ -58,15 +57,13 @@ class EquitiesAnalyzer(base_analyzer.FiDataAnalyzerBase):
         return value_table, holdings_table
 
     def write_summary_to_doc(
-        self, xml_data: str, creds: Any, docs_service: Any, document_id: str
+        self, xml_data: str, doc_builder: google_docs_utils.GoogleDocBuilder
     ):
         """Writes equities summary to doc."""
         if isinstance(xml_data, str):
             xml_data = [xml_data]
 
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=document_id, docs_service=docs_service, heading="Equities"
-        )
+        doc_builder.add_heading(heading="Equities")
 
         for index, xml in enumerate(xml_data):
             # Extract data from XML
@@ -75,20 +72,8 @@ class EquitiesAnalyzer(base_analyzer.FiDataAnalyzerBase):
             )
 
             # Write title and summary table to Google Doc
-            google_docs_utils.write_title_to_google_doc(
-                doc_id=document_id,
-                docs_service=docs_service,
-                title=f"Broker {index+1}",
-            )
-            google_docs_utils.write_table_to_google_doc(
-                table_data=value_table,
-                doc_id=document_id,
-                creds=creds,
-                docs_service=docs_service,
-            )
-            google_docs_utils.write_table_to_google_doc(
-                table_data=holdings_table,
-                doc_id=document_id,
-                creds=creds,
-                docs_service=docs_service,
+            doc_builder.add_title(
+                title=f"Broker {index + 1}",
             )
+            doc_builder.add_table(table_data=value_table)
+            doc_builder.add_table(table_data=holdings_table)
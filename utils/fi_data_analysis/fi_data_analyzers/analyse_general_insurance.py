@@ -1,7 +1,6 @@
 """Analyzes general insurance data and adds summary to google doc."""
 
 import xml.etree.ElementTree as ET
-from typing import Any
 
 from utils import google_docs_utils
 from utils.fi_data_analysis.fi_data_analyzers import base_analyzer
@@ -38,15 +37,13 @@ class GeneralInsuranceAnalyzer(base_analyzer.FiDataAnalyzerBase):
         return summary_data
 
     def write_summary_to_doc(
-        self, xml_data: str, creds: Any, docs_service: Any, document_id: str
+        self, xml_data: str, doc_builder: google_docs_utils.GoogleDocBuilder
     ):
         """Writes general insurance summary to doc."""
         if isinstance(xml_data, str):
             xml_data = [xml_data]
 
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=document_id,
-            docs_service=docs_service,
+        doc_builder.add_heading(
             heading="General Insurance Policies",
         )
 
@@ -57,14 +54,7 @@ class GeneralInsuranceAnalyzer(base_analyzer.FiDataAnalyzerBase):
             )
 
             # Write title and summary table to Google Doc
-            google_docs_utils.write_title_to_google_doc(
-                doc_id=document_id,
-                docs_service=docs_service,
-                title=f"Policy {index+1} Details",
-            )
-            google_docs_utils.write_table_to_google_doc(
-                table_data=summary_data,
-                doc_id=document_id,
-                creds=creds,
-                docs_service=docs_service,
+            doc_builder.add_title(
+                title=f"Policy {index + 1} Details",
             )
+            doc_builder.add_table(table_data=summary_data)
@@ -1,13 +1,13 @@
 """Base handler to analyze accounts data and add summary to google doc."""
 
-from typing import Any
+from utils import google_docs_utils
 
 
 class FiDataAnalyzerBase:
     """Base class for FI data analyzers."""
 
     def write_summary_to_doc(
-        self, xml_data: str, creds: Any, docs_service: Any, document_id: str
+        self, xml_data: str, doc_builder: google_docs_utils.GoogleDocBuilder
     ):
-        """Writes summary to google doc."""
+        """Adds summary to google doc builder."""
         raise NotImplementedError
@@ -1,27 +1,73 @@
 """Helper library to interact with google docs."""
 
+import collections
 import io
 import logging
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Optional
 
-from gdoctableapppy import gdoctableapp
 from google.oauth2 import service_account
 from googleapiclient import discovery, errors, http
 
 from constants import customer_profile_doc
 
+GOOGLE_API_SCOPES = [
+    "https://www.googleapis.com/auth/documents",
+    "https://www.googleapis.com/auth/drive",
+]
+
+# Service account credentials shared by the process, loaded on first use.
+# Access tokens are refreshed by the clients when they expire.
+_google_creds = None
+_google_creds_lock = threading.Lock()
+
+# Google API clients are not thread safe, so each thread builds its own.
+_thread_local_services = threading.local()
+
+
+def _get_google_creds() -> service_account.Credentials:
+    """Loads the service account credentials once per process."""
+    global _google_creds
+    if _google_creds is None:
+        with _google_creds_lock:
+            if _google_creds is None:
+                _google_creds = (
+                    service_account.Credentials.from_service_account_file(
+                        customer_profile_doc.SERVICE_ACCOUNT_FILEPATH,
+                        scopes=GOOGLE_API_SCOPES,
+                    )
+                )
+    return _google_creds
+
+
+def _get_google_service(service_name: str, version: str) -> Any:
+    """Gets the google API client of current thread, building it once."""
+    if not hasattr(_thread_local_services, "services"):
+        _thread_local_services.services = {}
+    services = _thread_local_services.services
+    if (service_name, version) not in services:
+        # Use the discovery document bundled with the client library instead
+        # of fetching it over the network.
+        services[(service_name, version)] = discovery.build(
+            service_name,
+            version,
+            credentials=_get_google_creds(),
+            static_discovery=True,
+            cache_discovery=False,
+        )
+    return services[(service_name, version)]
+
 
 def get_google_doc_creds() -> tuple[any]:
-    """Gets the creds for writing to google docs."""
-    scopes = [
-        "https://www.googleapis.com/auth/documents",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = service_account.Credentials.from_service_account_file(
-        customer_profile_doc.SERVICE_ACCOUNT_FILEPATH, scopes=scopes
-    )
-    docs_service = discovery.build("docs", "v1", credentials=creds)
-    drive_service = discovery.build("drive", "v3", credentials=creds)
+    """Gets the creds and clients for writing to google docs.
+
+    Credentials are loaded once per process and clients are built once per
+    thread, so repeated calls are cheap.
+    """
+    creds = _get_google_creds()
+    docs_service = _get_google_service(service_name="docs", version="v1")
+    drive_service = _get_google_service(service_name="drive", version="v3")
     return creds, docs_service, drive_service
 
 
@@ -71,6 +117,90 @@ def get_doc_as_md(doc_id: str, drive_service: any) -> str:
     return file.getvalue().decode("utf-8")
 
 
+def get_doc_modified_time(doc_id: str, drive_service: any) -> Optional[str]:
+    """Gets the time at which given google doc was last modified."""
+    try:
+        file = (
+            drive_service.files()
+            .get(fileId=doc_id, fields="modifiedTime")
+            .execute()
+        )
+    except errors.HttpError as error:
+        logging.error(f"Error {error} getting modified time of doc {doc_id}.")
+        return None
+    return file.get("modifiedTime")
+
+
+# Markdown of exported google docs by doc id along with the drive modified
+# time of the export and the time at which it was last validated, ordered
+# from least to most recently used.
+_doc_markdown_cache: collections.OrderedDict[str, tuple[str, str, float]] = (
+    collections.OrderedDict()
+)
+_doc_markdown_cache_lock = threading.Lock()
+
+
+def _get_cached_export(doc_id: str) -> Optional[tuple[str, str, float]]:
+    """Gets the cached export of a doc and marks it as recently used."""
+    with _doc_markdown_cache_lock:
+        cached_export = _doc_markdown_cache.get(doc_id)
+        if cached_export:
+            _doc_markdown_cache.move_to_end(doc_id)
+        return cached_export
+
+
+def _cache_export(doc_id: str, cached_export: tuple[str, str, float]):
+    """Caches the export of a doc, evicting the least recently used ones."""
+    with _doc_markdown_cache_lock:
+        _doc_markdown_cache[doc_id] = cached_export
+        _doc_markdown_cache.move_to_end(doc_id)
+        while (
+            len(_doc_markdown_cache) > customer_profile_doc.DOC_CACHE_MAX_DOCS
+        ):
+            _doc_markdown_cache.popitem(last=False)
+
+
+def get_cached_doc_as_md(doc_id: str, drive_service: any) -> str:
+    """Exports given google doc as markdown text, reusing recent exports.
+
+    An export is reused without any drive call for `DOC_CACHE_TTL_SEC`. After
+    that the doc is exported again only if its modified time has changed.
+    At most `DOC_CACHE_MAX_DOCS` exports are kept.
+    """
+    cached_export = _get_cached_export(doc_id=doc_id)
+    now = time.monotonic()
+    if (
+        cached_export
+        and now - cached_export[2] < customer_profile_doc.DOC_CACHE_TTL_SEC
+    ):
+        return cached_export[0]
+
+    modified_time = get_doc_modified_time(
+        doc_id=doc_id, drive_service=drive_service
+    )
+    if cached_export and modified_time == cached_export[1]:
+        _cache_export(
+            doc_id=doc_id,
+            cached_export=(cached_export[0], modified_time, now),
+        )
+        return cached_export[0]
+
+    markdown_content = get_doc_as_md(
+        doc_id=doc_id, drive_service=drive_service
+    )
+    if markdown_content and modified_time:
+        _cache_export(
+            doc_id=doc_id, cached_export=(markdown_content, modified_time, now)
+        )
+    return markdown_content
+
+
+def invalidate_cached_doc(doc_id: str):
+    """Drops the cached export of a google doc after it is modified."""
+    with _doc_markdown_cache_lock:
+        _doc_markdown_cache.pop(doc_id, None)
+
+
 def create_new_google_doc(docs_service: any, title: str) -> str:
     """Creates a new google doc with given title."""
     doc = docs_service.documents().create(body={"title": title}).execute()
@@ -86,101 +216,166 @@ def get_document_length(docs_service: Any, doc_id: str) -> str:
     return doc.get("body").get("content")[-1].get("endIndex")
 
 
-def write_heading_to_google_doc(
-    doc_id: str, heading: str, docs_service: Any, heading_level: str = "2"
-):
-    """Writes a heading to the Google Doc."""
-    # Get the current document length to insert at the end
-    end_index = get_document_length(docs_service=docs_service, doc_id=doc_id)
-
-    # Prepare requests to insert the heading at the end
-    requests = [
-        {
-            "insertText": {
-                "location": {
-                    "index": end_index - 1  # Insert just before the end
-                },
-                "text": heading + "\n",
-            }
-        },
-        {
-            "updateParagraphStyle": {
-                "range": {
-                    "startIndex": end_index,
-                    "endIndex": end_index + len(heading),
-                },
-                "paragraphStyle": {
-                    "namedStyleType": f"HEADING_{heading_level}"
-                },
-                "fields": "namedStyleType",
-            }
-        },
-    ]
-
-    # Execute batch update
-    docs_service.documents().batchUpdate(
-        documentId=doc_id, body={"requests": requests}
-    ).execute()
-    logging.info(f"Heading '{heading}' added successfully.")
+def _text_length(text: str) -> int:
+    """Gets the length of text in google doc indices, i.e. UTF-16 units."""
+    return len(text.encode("utf-16-le")) // 2
 
 
-def write_title_to_google_doc(
-    doc_id: str,
-    title: str,
-    docs_service: Any,
-):
-    """Writes a title to the Google Doc."""
-    # Get the current document length to insert at the end
-    end_index = get_document_length(docs_service=docs_service, doc_id=doc_id)
-
-    # Prepare requests to insert the title at the end
-    requests = [
-        {
-            "insertText": {
-                "location": {
-                    "index": end_index - 1  # Insert just before the end
+class GoogleDocBuilder:
+    """Accumulates content locally and appends it to a google doc at once.
+
+    Blocks are inserted in reverse order at the end of the doc, so indices of
+    every block can be computed relative to the same insertion index without
+    reading the doc after each write. Each block sets its paragraph style
+    explicitly since inserted text inherits the style of the paragraph it is
+    inserted into.
+    """
+
+    def __init__(self, doc_id: str, docs_service: Any) -> None:
+        """Initialise an empty builder for given google doc."""
+        self.doc_id = doc_id
+        self.docs_service = docs_service
+        # Builds requests of a block for the index at which it is inserted.
+        self._blocks: list[Callable[[int], list[dict]]] = []
+
+    def add_heading(self, heading: str, heading_level: str = "2"):
+        """Adds a heading at the end of the doc."""
+
+        def build_requests(index: int) -> list[dict]:
+            return [
+                {
+                    "insertText": {
+                        "location": {"index": index},
+                        "text": heading + "\n",
+                    }
                 },
-                "text": "\n" + title + "\n",
-            }
-        }
-    ]
-
-    # Execute batch update
-    docs_service.documents().batchUpdate(
-        documentId=doc_id, body={"requests": requests}
-    ).execute()
-    logging.info(f"Title '{title}' added successfully.")
+                {
+                    "updateParagraphStyle": {
+                        "range": {
+                            "startIndex": index,
+                            "endIndex": index + _text_length(heading) + 1,
+                        },
+                        "paragraphStyle": {
+                            "namedStyleType": f"HEADING_{heading_level}"
+                        },
+                        "fields": "namedStyleType",
+                    }
+                },
+            ]
 
+        self._blocks.append(build_requests)
 
-def write_table_to_google_doc(
-    table_data: list[list[str]], doc_id: str, creds: Any, docs_service: Any
-):
-    """Writes a table to the Google Doc."""
-    # Ensure the table_data is not empty
-    if not table_data or not all(isinstance(row, list) for row in table_data):
-        raise ValueError(
-            "Invalid table data provided. Expected a list of lists."
-        )
+    def add_title(self, title: str):
+        """Adds a paragraph of normal text after an empty line."""
 
-    # Prepare the table resource
-    rows = len(table_data)  # Number of rows in the table
-    columns = len(
-        table_data[0]
-    )  # Number of columns in the table (assumed uniform)
-
-    # Get the current document length to insert at the end
-    end_index = get_document_length(docs_service=docs_service, doc_id=doc_id)
-
-    # Create table resource for Google Docs API
-    table_resource = {
-        "service_account": creds,
-        "documentId": doc_id,
-        "rows": rows,
-        "columns": columns,
-        "createIndex": end_index - 1,  # Insert the table at the end
-        "values": table_data,
-    }
-
-    # Create the table
-    res = gdoctableapp.CreateTable(table_resource)
-    logging.info("Table Response:", res)
+        def build_requests(index: int) -> list[dict]:
+            return [
+                {
+                    "insertText": {
+                        "location": {"index": index},
+                        "text": "\n" + title + "\n",
+                    }
+                },
+                {
+                    "updateParagraphStyle": {
+                        "range": {
+                            "startIndex": index,
+                            "endIndex": index + _text_length(title) + 2,
+                        },
+                        "paragraphStyle": {"namedStyleType": "NORMAL_TEXT"},
+                        "fields": "namedStyleType",
+                    }
+                },
+            ]
+
+        self._blocks.append(build_requests)
+
+    def add_table(self, table_data: list[list[str]]):
+        """Adds a table filled with given rows at the end of the doc."""
+        # Ensure the table_data is not empty
+        if not table_data or not all(
+            isinstance(row, list) for row in table_data
+        ):
+            raise ValueError(
+                "Invalid table data provided. Expected a list of lists."
+            )
+        rows = len(table_data)  # Number of rows in the table
+        columns = max(len(row) for row in table_data)
+
+        def build_requests(index: int) -> list[dict]:
+            requests = [
+                {
+                    "insertTable": {
+                        "location": {"index": index},
+                        "rows": rows,
+                        "columns": columns,
+                    }
+                }
+            ]
+            # A newline is inserted at index before the table. Content of
+            # each empty cell starts after the table, row and cell start.
+            table_length = 2 + rows * (2 * columns + 1)
+            cell_requests = []
+            for row_index, row in enumerate(table_data):
+                for column_index, value in enumerate(row):
+                    text = str(value)
+                    if not text:
+                        continue
+                    cell_index = (
+                        index
+                        + 4
+                        + row_index * (2 * columns + 1)
+                        + 2 * column_index
+                    )
+                    cell_requests.append(
+                        {
+                            "insertText": {
+                                "location": {"index": cell_index},
+                                "text": text,
+                            }
+                        }
+                    )
+                    table_length += _text_length(text)
+            # Fill cells from the last one so that indices of the previous
+            # cells are not shifted.
+            requests.extend(reversed(cell_requests))
+            requests.append(
+                {
+                    "updateParagraphStyle": {
+                        "range": {
+                            "startIndex": index,
+                            "endIndex": index + table_length,
+                        },
+                        "paragraphStyle": {"namedStyleType": "NORMAL_TEXT"},
+                        "fields": "namedStyleType",
+                    }
+                }
+            )
+            return requests
+
+        self._blocks.append(build_requests)
+
+    def flush(self):
+        """Appends all the added blocks to the doc in a single batch update."""
+        if not self._blocks:
+            return
+        # Insert just before the final newline of the doc.
+        index = (
+            get_document_length(
+                docs_service=self.docs_service, doc_id=self.doc_id
+            )
+            - 1
+        )
+        requests = []
+        for build_requests in reversed(self._blocks):
+            requests.extend(build_requests(index))
+
+        self.docs_service.documents().batchUpdate(
+            documentId=self.doc_id, body={"requests": requests}
+        ).execute()
+        invalidate_cached_doc(doc_id=self.doc_id)
+        logging.info(
+            f"Added {len(self._blocks)} blocks to doc {self.doc_id} using "
+            f"{len(requests)} requests."
+        )
+        self._blocks = []
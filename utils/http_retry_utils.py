@@ -0,0 +1,218 @@
+"""Helper library to decide retries of HTTP requests and fail fast."""
+
+import datetime
+import email.utils
+import enum
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from constants import api_constants
+
+# Requests which can be repeated without changing the result.
+IDEMPOTENT_METHODS = frozenset(
+    {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+)
+
+# Statuses which mean the request was not processed and can be retried.
+RETRY_ANY_METHOD_STATUSES = frozenset({429, 503})
+
+# Statuses worth retrying only if repeating the request is harmless.
+RETRY_IDEMPOTENT_STATUSES = frozenset({408, 500, 502, 504})
+
+# Errors raised before the request was sent, so it can always be retried.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class RetryPolicy:
+    """Decides whether and when a failed request is retried.
+
+    Non idempotent requests are retried only when the request is known to
+    not have been processed, unless the caller marks them safe to repeat.
+    Delays grow exponentially with full jitter, or follow the `Retry-After`
+    header, and no retry is made after the deadline of the call.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay_sec: float = api_constants.RETRY_BASE_DELAY_SEC,
+        max_delay_sec: float = api_constants.RETRY_MAX_DELAY_SEC,
+        deadline_sec: float = api_constants.REQUEST_DEADLINE_SEC,
+        retry_non_idempotent: bool = False,
+    ) -> None:
+        """Initialise the retry policy.
+
+        Args:
+            max_attempts: Maximum attempts of a request.
+            base_delay_sec: Delay before the first retry, doubled after it.
+            max_delay_sec: Maximum delay before a retry.
+            deadline_sec: Time after which a request is not retried.
+            retry_non_idempotent: Whether requests of any method are safe to
+                repeat, such as POST calls which only compute a result.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay_sec = base_delay_sec
+        self.max_delay_sec = max_delay_sec
+        self.deadline_sec = deadline_sec
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def is_safe_to_repeat(self, method: str) -> bool:
+        """Checks if a request may be processed more than once."""
+        return (
+            self.retry_non_idempotent or method.upper() in IDEMPOTENT_METHODS
+        )
+
+    def is_retryable_status(self, method: str, status_code: int) -> bool:
+        """Checks if a request which got given status can be retried."""
+        if status_code in RETRY_ANY_METHOD_STATUSES:
+            return True
+        return status_code in RETRY_IDEMPOTENT_STATUSES and (
+            self.is_safe_to_repeat(method=method)
+        )
+
+    def is_retryable_error(self, method: str, error: Exception) -> bool:
+        """Checks if a request which raised given error can be retried."""
+        if isinstance(error, NOT_SENT_ERRORS):
+            return True
+        return isinstance(error, httpx.TransportError) and (
+            self.is_safe_to_repeat(method=method)
+        )
+
+    def get_backoff_delay(self, attempt: int) -> float:
+        """Gets a random delay before retrying after given attempt."""
+        return random.uniform(
+            0, min(self.max_delay_sec, self.base_delay_sec * 2**attempt)
+        )
+
+    def get_retry_delay(
+        self, attempt: int, response: Optional[httpx.Response] = None
+    ) -> float:
+        """Gets the delay before retrying, honouring `Retry-After` header."""
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after:
+            retry_after_delay = parse_retry_after(retry_after=retry_after)
+            if retry_after_delay is not None:
+                return retry_after_delay
+        return self.get_backoff_delay(attempt=attempt)
+
+    def get_timeout(self, deadline: float) -> httpx.Timeout:
+        """Gets the timeout of an attempt which must end before deadline."""
+        remaining_sec = max(deadline - time.monotonic(), 0.001)
+        return httpx.Timeout(
+            connect=min(api_constants.CONNECT_TIMEOUT_SEC, remaining_sec),
+            read=min(api_constants.READ_TIMEOUT_SEC, remaining_sec),
+            write=min(api_constants.WRITE_TIMEOUT_SEC, remaining_sec),
+            pool=min(api_constants.POOL_TIMEOUT_SEC, remaining_sec),
+        )
+
+
+def parse_retry_after(retry_after: str) -> Optional[float]:
+    """Parses `Retry-After` header given in seconds or as a HTTP date."""
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+class CircuitState(enum.Enum):
+    """States of a circuit breaker."""
+
+    CLOSED = 1  # Requests are sent.
+    OPEN = 2  # Requests fail fast without being sent.
+    HALF_OPEN = 3  # A single trial request is sent.
+
+
+class CircuitBreaker:
+    """Fails requests fast while a host keeps failing.
+
+    The circuit opens after consecutive failures. Once the reset timeout
+    passes a single trial request is allowed, which closes the circuit if it
+    succeeds and opens it again otherwise.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = api_constants.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout_sec: float = api_constants.CIRCUIT_RESET_TIMEOUT_SEC,
+    ) -> None:
+        """Initialise a closed circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self.state = CircuitState.CLOSED
+        self._num_failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Checks if a request can be sent to the host."""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if (
+                self.state == CircuitState.OPEN
+                and time.monotonic() - self._opened_at
+                >= self.reset_timeout_sec
+            ):
+                self.state = CircuitState.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Records that the host handled a request."""
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self._num_failures = 0
+
+    def record_failure(self):
+        """Records that the host failed or could not be reached."""
+        with self._lock:
+            self._num_failures += 1
+            if (
+                self.state == CircuitState.HALF_OPEN
+                or self._num_failures >= self.failure_threshold
+            ):
+                self.state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_trial(self):
+        """Allows a new trial if the trial request ended without an outcome.
+
+        Called when a request is cancelled or fails before reaching the host,
+        so that the circuit does not stay half open forever.
+        """
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self.state = CircuitState.OPEN
+
+    def record_response(self, status_code: int):
+        """Records the outcome of a request from its status."""
+        if status_code == 429 or status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+# Circuit breakers by base url.
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(base_url: str) -> CircuitBreaker:
+    """Gets the circuit breaker of given base url, creating it once."""
+    if base_url not in _circuit_breakers:
+        with _circuit_breakers_lock:
+            if base_url not in _circuit_breakers:
+                _circuit_breakers[base_url] = CircuitBreaker()
+    return _circuit_breakers[base_url]
@@ -1,6 +1,7 @@
 """Helper library for user onboarding journey."""
 
 import enum
+from typing import Optional
 
 from constants import customer_profile_doc
 from utils import data_utils, google_docs_utils
@@ -24,19 +25,56 @@ def check_advice_presence(text: str) -> bool:
     return bool(advice_str)
 
 
-def detect_user_journey_state(phone_number: str) -> UserJourneyStage:
-    """Detects the current user journey stage for a registered used."""
-    # Check if data has already been analyzed
+class UserDocumentContext:
+    """Google doc of a user, loaded once and shared within a call."""
+
+    def __init__(self, phone_number: str, doc_id: str, markdown_content: str):
+        """Initialise the document context of a user."""
+        self.phone_number = phone_number
+        self.doc_id = doc_id
+        self.markdown_content = markdown_content
+
+
+def load_user_document_context(phone_number: str) -> UserDocumentContext:
+    """Loads the google doc of a registered user as markdown."""
     doc_id = data_utils.get_doc_by_phone(phone_number=phone_number)
     if not doc_id:
-        return UserJourneyStage.AA_DATA_PENDING
+        return UserDocumentContext(
+            phone_number=phone_number, doc_id="", markdown_content=""
+        )
 
     # Get creds to access google doc
     _, _, drive_service = google_docs_utils.get_google_doc_creds()
 
-    markdown_content = google_docs_utils.get_doc_as_md(
+    markdown_content = google_docs_utils.get_cached_doc_as_md(
         doc_id=doc_id, drive_service=drive_service
     )
+    return UserDocumentContext(
+        phone_number=phone_number,
+        doc_id=doc_id,
+        markdown_content=markdown_content,
+    )
+
+
+def detect_user_journey_state(
+    phone_number: str, document_context: Optional[UserDocumentContext] = None
+) -> UserJourneyStage:
+    """Detects the current user journey stage for a registered used.
+
+    Args:
+        phone_number: Phone number of the user.
+        document_context: Google doc of the user if already loaded.
+    """
+    if document_context is None:
+        document_context = load_user_document_context(
+            phone_number=phone_number
+        )
+
+    # Check if data has already been analyzed
+    if not document_context.doc_id:
+        return UserJourneyStage.AA_DATA_PENDING
+
+    markdown_content = document_context.markdown_content
     if check_advice_presence(text=markdown_content):
         return UserJourneyStage.ADVICE_EXISTS
 
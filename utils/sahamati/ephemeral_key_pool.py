@@ -0,0 +1,106 @@
+"""Pool of single use key pairs for end to end encrypted FI requests."""
+
+import collections
+import logging
+import threading
+import time
+from typing import Optional
+
+from constants import sahamati_rahasya_constants
+from utils.sahamati import sahamati_rahasya_utils
+
+
+class EphemeralKeyPool:
+    """Keeps key pairs and nonces ready, refilled by a background thread.
+
+    Each key pair is handed out only once, and key pairs older than the TTL
+    are discarded instead of being used.
+    """
+
+    def __init__(self, pool_size: int, ttl_sec: float) -> None:
+        """Initialise an empty pool and start refilling it."""
+        self.pool_size = pool_size
+        self.ttl_sec = ttl_sec
+        # Key pairs along with the time at which they were generated.
+        self._key_pairs: collections.deque[tuple[float, tuple]] = (
+            collections.deque()
+        )
+        self._lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._refill_needed.set()
+        threading.Thread(
+            target=self._refill_forever, name="ephemeral-key-pool", daemon=True
+        ).start()
+
+    def _drop_expired_key_pairs(self):
+        """Drops the key pairs older than the TTL. Needs the lock."""
+        expired_before = time.monotonic() - self.ttl_sec
+        while self._key_pairs and self._key_pairs[0][0] < expired_before:
+            self._key_pairs.popleft()
+
+    def _refill_forever(self):
+        """Fills the pool whenever key pairs are drawn or expire."""
+        while True:
+            self._refill_needed.wait(timeout=self.ttl_sec / 2)
+            self._refill_needed.clear()
+            while True:
+                with self._lock:
+                    self._drop_expired_key_pairs()
+                    if len(self._key_pairs) >= self.pool_size:
+                        break
+                try:
+                    key_pair = self._generate_key_pair()
+                except Exception as e:
+                    logging.error(f"Failed to generate ephemeral key: {e}")
+                    key_pair = None
+                if key_pair is None:
+                    break
+                with self._lock:
+                    self._key_pairs.append((time.monotonic(), key_pair))
+
+    @staticmethod
+    def _generate_key_pair() -> Optional[tuple]:
+        """Generates a nonce and key pair for a FI request."""
+        return (
+            sahamati_rahasya_utils.get_public_private_key_pair_for_fi_request()
+        )
+
+    def get_key_pair(self) -> Optional[tuple]:
+        """Draws an unused key pair, generating one if the pool is empty.
+
+        Returns:
+            Our nonce, our private key and our public key material.
+        """
+        with self._lock:
+            self._drop_expired_key_pairs()
+            key_pair = (
+                self._key_pairs.popleft()[1] if self._key_pairs else None
+            )
+        self._refill_needed.set()
+        if key_pair is None:
+            logging.info("Ephemeral key pool is empty, generating a key.")
+            key_pair = self._generate_key_pair()
+        return key_pair
+
+
+# Key pool shared by the process, created on first use.
+_key_pool = None
+_key_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> EphemeralKeyPool:
+    """Gets the key pool of the process, which starts filling when created."""
+    global _key_pool
+    if _key_pool is None:
+        with _key_pool_lock:
+            if _key_pool is None:
+                _key_pool = EphemeralKeyPool(
+                    pool_size=sahamati_rahasya_constants.KEY_POOL_SIZE,
+                    ttl_sec=sahamati_rahasya_constants.KEY_POOL_TTL_SEC,
+                )
+    return _key_pool
+
+
+def get_key_pair_for_fi_request() -> Optional[tuple]:
+    """Gets a new single use key pair and nonce for a FI request."""
+    return get_key_pool().get_key_pair()
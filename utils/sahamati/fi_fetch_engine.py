@@ -0,0 +1,321 @@
+"""Helper library to fetch FI data of many accounts concurrently."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from constants import sahamatinet_constants
+from utils import http_retry_utils
+from utils.sahamati import (
+    fi_fetch_poller,
+    sahamati_rahasya_utils,
+    sahamatinet_utils,
+)
+
+
+class RateLimiter:
+    """Spaces out calls so that at most given calls are made per second."""
+
+    def __init__(self, calls_per_sec: float) -> None:
+        """Initialise the rate limiter."""
+        self.interval = 1 / calls_per_sec
+        self._next_call_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        """Waits until the next call is allowed."""
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            if self._next_call_at > now:
+                await asyncio.sleep(self._next_call_at - now)
+            self._next_call_at = max(now, self._next_call_at) + self.interval
+
+
+class FiFetchEngine:
+    """Fetches data of accounts linked to a consent concurrently.
+
+    Blocking SahamatiNet and Rahasya calls run in worker threads. The number
+    of calls in flight is bounded, and calls to each FIP are rate limited.
+    """
+
+    def __init__(
+        self,
+        sahamatinet_member_token: str,
+        max_concurrency: int = sahamatinet_constants.FI_FETCH_MAX_CONCURRENCY,
+        fip_calls_per_sec: float = sahamatinet_constants.FIP_MAX_CALLS_PER_SEC,
+    ) -> None:
+        """Initialise the engine for a sahamatinet member."""
+        self.sahamatinet_member_token = sahamatinet_member_token
+        self.fip_calls_per_sec = fip_calls_per_sec
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._fip_rate_limiters: dict[str, RateLimiter] = {}
+        # Records of all FI fetch attempts made by the engine.
+        self.fetch_attempts: list[fi_fetch_poller.FetchAttempt] = []
+
+    async def _call(
+        self, func: Callable, rate_limit_fip_id: Optional[str] = None, **kwargs
+    ) -> Any:
+        """Runs a blocking call within the limits of the engine.
+
+        Args:
+            func: Blocking function to call with given keyword arguments.
+            rate_limit_fip_id: FIP whose rate limit applies to the call.
+            **kwargs: Keyword arguments of the function.
+        """
+        async with self._semaphore:
+            if rate_limit_fip_id is not None:
+                if rate_limit_fip_id not in self._fip_rate_limiters:
+                    self._fip_rate_limiters[rate_limit_fip_id] = RateLimiter(
+                        calls_per_sec=self.fip_calls_per_sec
+                    )
+                await self._fip_rate_limiters[rate_limit_fip_id].wait()
+            return await asyncio.to_thread(func, **kwargs)
+
+    async def _decrypt_fi_block(
+        self, fi_block: dict, our_private_key: str, our_nonce: str
+    ) -> list[tuple[str, str]]:
+        """Decrypts all data blocks of an FI block using our private key.
+
+        Returns:
+            Link reference number and decrypted data of each data block.
+        """
+        remote_key_material = dict(fi_block["KeyMaterial"])
+        remote_nonce = remote_key_material.pop("Nonce")
+
+        # Derive the shared key once per FI block, in a single call, so that
+        # it is dropped as soon as the block is decrypted.
+        decrypted_strings = await self._call(
+            sahamati_rahasya_utils.decrypt_fi_data_blocks,
+            encrypted_data_blocks=[
+                data_block["encryptedFI"] for data_block in fi_block["data"]
+            ],
+            our_private_key=our_private_key,
+            remote_key_material=remote_key_material,
+            our_nonce=our_nonce,
+            remote_nonce=remote_nonce,
+        )
+        return [
+            (data_block["linkRefNumber"], decrypted_string)
+            for data_block, decrypted_string in zip(
+                fi_block["data"], decrypted_strings
+            )
+            if decrypted_string
+        ]
+
+    async def _open_fi_session(
+        self, consent_id: str, allowed_fetch_duration: dict
+    ) -> Optional[tuple[str, str, str]]:
+        """Creates an FI request session for a consent.
+
+        Returns:
+            Session id, our nonce and our private key of the session.
+        """
+        # Get signed consent to generate session id
+        signed_consent = await self._call(
+            sahamatinet_utils.fetch_consent,
+            consent_id=consent_id,
+            sahamatinet_member_token=self.sahamatinet_member_token,
+        )
+        if not signed_consent:
+            return None
+
+        # Generate session id
+        return await self._call(
+            sahamatinet_utils.create_fi_request,
+            consent_id=consent_id,
+            signed_consent=signed_consent,
+            sahamatinet_member_token=self.sahamatinet_member_token,
+            start_date=allowed_fetch_duration["from"],
+            end_date=allowed_fetch_duration["to"],
+        )
+
+    async def fetch_fip_accounts(
+        self,
+        fip_id: str,
+        accounts: list[dict],
+        session_id: str,
+        our_nonce: str,
+        our_private_key: str,
+    ) -> dict[str, list[str]]:
+        """Fetches decrypted data of all accounts of a FIP in one session.
+
+        Returns:
+            Decrypted data by link reference number of accounts.
+        """
+        link_ref_numbers = [account["linkRefNumber"] for account in accounts]
+
+        # SahamatiNet proxy returns simulated response for FI/fetch call.
+        mock_params = {}
+        if sahamatinet_constants.SIMULATE_FI_FETCH:
+            mock_params = {
+                "recipient-id": sahamatinet_constants.MOCK_AA_SIMULATOR,
+                "x-scenario-id": f"{accounts[0]['fiType']}_OK",
+            }
+            our_private_key = sahamatinet_constants.FIU_ECC_KEY_PAIR[
+                "privateKey"
+            ]
+            our_nonce = sahamatinet_constants.FIU_NONCE
+
+        # Wait for data to be available and fetch once ready
+        data = await fi_fetch_poller.poll_until_ready(
+            fetch=lambda deadline: self._call(
+                fi_fetch_once,
+                rate_limit_fip_id=fip_id,
+                deadline=deadline,
+                fip_id=fip_id,
+                accounts=link_ref_numbers,
+                session_id=session_id,
+                sahamatinet_member_token=self.sahamatinet_member_token,
+                mock_params=mock_params,
+            ),
+            description=f"{link_ref_numbers} of {fip_id}",
+            on_attempt=self.fetch_attempts.append,
+        )
+        if not data:
+            return {}
+
+        # Read encrypted fi data and decrypt it using our private key
+        decrypted_fi_blocks = await asyncio.gather(
+            *(
+                self._decrypt_fi_block(
+                    fi_block=fi_block,
+                    our_private_key=our_private_key,
+                    our_nonce=our_nonce,
+                )
+                for fi_block in data["FI"]
+            )
+        )
+
+        # Route decrypted data blocks back to their accounts.
+        fip_accounts_data = {
+            link_ref_number: [] for link_ref_number in link_ref_numbers
+        }
+        for decrypted_blocks in decrypted_fi_blocks:
+            for link_ref_number, decrypted_string in decrypted_blocks:
+                if sahamatinet_constants.SIMULATE_FI_FETCH:
+                    # Simulated responses are per FI type, not per account.
+                    for account_data in fip_accounts_data.values():
+                        account_data.append(decrypted_string)
+                elif link_ref_number in fip_accounts_data:
+                    fip_accounts_data[link_ref_number].append(decrypted_string)
+                else:
+                    logging.warning(
+                        f"Dropped data of unknown account {link_ref_number} "
+                        f"from {fip_id}."
+                    )
+        return fip_accounts_data
+
+    async def fetch_accounts(
+        self,
+        consent_id: str,
+        accounts: list[dict],
+        allowed_fetch_duration: dict,
+        on_account_fetched: Optional[
+            Callable[[dict, Optional[list[str]]], None]
+        ] = None,
+    ) -> list[Optional[list[str]]]:
+        """Fetches data of all accounts concurrently.
+
+        A single FI session is opened for the consent, and data of all the
+        accounts of a FIP is fetched using a single FI fetch call.
+
+        Args:
+            consent_id: Id of consent used to fetch data.
+            accounts: Accounts linked with the consent.
+            allowed_fetch_duration: Date range of data allowed by consent.
+            on_account_fetched: Called from the event loop thread with the
+                account and its data, as soon as an account is fetched.
+
+        Returns:
+            Decrypted data of each account in the same order, or None for
+            accounts which could not be fetched.
+        """
+        accounts_data: list[Optional[list[str]]] = [None] * len(accounts)
+
+        def report_fetched(account_indices: list[int]):
+            if on_account_fetched is None:
+                return
+            for account_index in account_indices:
+                on_account_fetched(
+                    accounts[account_index], accounts_data[account_index]
+                )
+
+        try:
+            fi_session = await self._open_fi_session(
+                consent_id=consent_id,
+                allowed_fetch_duration=allowed_fetch_duration,
+            )
+        except Exception as e:
+            logging.error(f"Error opening FI session for {consent_id}: {e}")
+            fi_session = None
+        if not fi_session:
+            report_fetched(account_indices=list(range(len(accounts))))
+            return accounts_data
+        session_id, our_nonce, our_private_key = fi_session
+
+        async def fetch_and_report(fip_id: str, account_indices: list[int]):
+            try:
+                fip_accounts_data = await self.fetch_fip_accounts(
+                    fip_id=fip_id,
+                    accounts=[accounts[i] for i in account_indices],
+                    session_id=session_id,
+                    our_nonce=our_nonce,
+                    our_private_key=our_private_key,
+                )
+            except Exception as e:
+                logging.error(f"Error fetching data from {fip_id}: {e}")
+                fip_accounts_data = {}
+            for account_index in account_indices:
+                link_ref_number = accounts[account_index]["linkRefNumber"]
+                accounts_data[account_index] = (
+                    fip_accounts_data.get(link_ref_number) or None
+                )
+            report_fetched(account_indices=account_indices)
+
+        await asyncio.gather(
+            *(
+                fetch_and_report(fip_id=fip_id, account_indices=indices)
+                for (fip_id, _), indices in group_accounts_by_fip(
+                    accounts=accounts
+                ).items()
+            )
+        )
+        fi_fetch_poller.log_fetch_attempts(fetch_attempts=self.fetch_attempts)
+        return accounts_data
+
+
+def fi_fetch_once(deadline: float, **kwargs) -> Optional[dict]:
+    """Calls FI fetch once without retries, giving up at deadline.
+
+    The poller retries FI fetch itself, so retries of the request would only
+    stack up and overrun the time allowed for polling.
+
+    Args:
+        deadline: Monotonic time by which the call must end.
+        **kwargs: Keyword arguments of `sahamatinet_utils.fi_fetch`.
+    """
+    return sahamatinet_utils.fi_fetch(
+        retry_policy=http_retry_utils.RetryPolicy(
+            max_attempts=1, deadline_sec=deadline - time.monotonic()
+        ),
+        **kwargs,
+    )
+
+
+def group_accounts_by_fip(accounts: list[dict]) -> dict[tuple, list[int]]:
+    """Groups indices of accounts which can be fetched in one FI fetch call.
+
+    Accounts are grouped by FIP. Simulated responses are configured per FI
+    type, so accounts are also grouped by FI type when fetch is simulated.
+    """
+    account_groups = {}
+    for account_index, account in enumerate(accounts):
+        group_key = (
+            account["fipHandle"],
+            account["fiType"]
+            if sahamatinet_constants.SIMULATE_FI_FETCH
+            else None,
+        )
+        account_groups.setdefault(group_key, []).append(account_index)
+    return account_groups
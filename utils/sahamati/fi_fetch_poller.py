@@ -0,0 +1,115 @@
+"""Helper library to poll FI fetch until data of a session is ready."""
+
+import asyncio
+import logging
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, Optional
+
+from constants import sahamatinet_constants
+
+
+class FetchAttempt:
+    """Outcome and latency of a single FI fetch attempt."""
+
+    def __init__(
+        self,
+        description: str,
+        attempt: int,
+        latency_sec: float,
+        is_ready: bool,
+    ) -> None:
+        """Initialise the record of an attempt."""
+        self.description = description
+        self.attempt = attempt
+        self.latency_sec = latency_sec
+        self.is_ready = is_ready
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Gets the delay before retrying after given attempt.
+
+    The delay grows exponentially up to `MAX_DELAY_FOR_RETRY` and a random
+    jitter of up to half of it is subtracted, so that sessions created
+    together do not poll the proxy in lockstep.
+    """
+    delay = min(
+        sahamatinet_constants.MAX_DELAY_FOR_RETRY,
+        sahamatinet_constants.DELAY_FOR_RETRY
+        * sahamatinet_constants.RETRY_BACKOFF_MULTIPLIER ** (attempt - 1),
+    )
+    return random.uniform(delay / 2, delay)
+
+
+async def poll_until_ready(
+    fetch: Callable[[float], Awaitable[Optional[dict]]],
+    description: str,
+    max_trials: int = sahamatinet_constants.MAX_TRIALS,
+    max_wait_sec: float = sahamatinet_constants.FI_FETCH_MAX_WAIT_SEC,
+    on_attempt: Optional[Callable[[FetchAttempt], None]] = None,
+) -> Optional[dict]:
+    """Calls fetch with exponential backoff until it returns data.
+
+    Polling stops by raising `asyncio.CancelledError` when the calling task
+    is cancelled, including while waiting between attempts.
+
+    Args:
+        fetch: Coroutine function that returns data once it is ready. It is
+            called with the monotonic time by which the attempt must end.
+        description: Describes what is being fetched in logs.
+        max_trials: Maximum number of fetch attempts.
+        max_wait_sec: Maximum time to wait for the data across attempts.
+        on_attempt: Called with the record of each attempt.
+
+    Returns:
+        Data returned by fetch, or None if it was not ready in time.
+    """
+    deadline = time.monotonic() + max_wait_sec
+    for attempt in range(1, max_trials + 1):
+        start_time = time.monotonic()
+        data = await fetch(deadline)
+        latency_sec = time.monotonic() - start_time
+        if on_attempt is not None:
+            on_attempt(
+                FetchAttempt(
+                    description=description,
+                    attempt=attempt,
+                    latency_sec=latency_sec,
+                    is_ready=bool(data),
+                )
+            )
+        if data:
+            logging.info(
+                f"Success for {description} on trial {attempt} "
+                f"in {latency_sec:.2f} seconds."
+            )
+            return data
+
+        delay = get_backoff_delay(attempt=attempt)
+        if attempt == max_trials or time.monotonic() + delay > deadline:
+            break
+        logging.error(
+            f"Trial {attempt} failed for {description} in "
+            f"{latency_sec:.2f} seconds. Retrying in {delay:.2f} seconds..."
+        )
+        await asyncio.sleep(delay)
+
+    logging.error(f"Data not ready for {description} after {attempt} trials.")
+    return None
+
+
+def log_fetch_attempts(fetch_attempts: list[FetchAttempt]):
+    """Logs latency statistics of fetch attempts to tune the constants."""
+    if not fetch_attempts:
+        return
+    latencies = [attempt.latency_sec for attempt in fetch_attempts]
+    ready_attempts = [
+        attempt.attempt for attempt in fetch_attempts if attempt.is_ready
+    ]
+    logging.info(
+        f"FI fetch attempts: {len(fetch_attempts)}, ready: "
+        f"{len(ready_attempts)}, ready on trials: {ready_attempts}, "
+        f"latency median: {statistics.median(latencies):.2f}s, "
+        f"max: {max(latencies):.2f}s."
+    )
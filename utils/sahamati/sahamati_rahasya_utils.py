@@ -1,31 +1,98 @@
-"""Utilities to encrypt and decrypt fi messages using sahamati rahasya APIs.
+"""Utilities to encrypt and decrypt fi messages as sahamati rahasya does.
 
-Based on https://github.com/Sahamati/rahasya.
+Based on https://github.com/Sahamati/rahasya, implemented in process instead
+of calling a rahasya server.
+
+Data is encrypted with AES-GCM using a key derived with HKDF-SHA256 from the
+ECDH shared secret of both parties. The XOR of both nonces provides the HKDF
+salt (first 20 bytes) and the AES-GCM IV (last 12 bytes).
 """
 
 import base64
+import datetime
 import logging
 import secrets
 from typing import Optional
 
+from cryptography import exceptions
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers import aead
+from cryptography.hazmat.primitives.kdf import hkdf
+
 from constants import sahamati_rahasya_constants
-from utils import api_utils
+from utils.sahamati import curve25519_utils
 
 # Sahamati Rahasya APIs
 
 
 def generate_ecc_key_pair() -> Optional[dict]:
-    """Generates ECC key pair."""
-    response = api_utils.make_request(
-        base_url=sahamati_rahasya_constants.HOST,
-        method="GET",
-        endpoint="/ecc/v1/generateKey",
+    """Generates ECC key pair in the format of rahasya's generateKey API."""
+    private_key = curve25519_utils.generate_private_key()
+    expiry = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+        days=sahamati_rahasya_constants.KEY_EXPIRY_DAYS
     )
+    return {
+        "privateKey": curve25519_utils.encode_private_key(private_key),
+        "errorInfo": None,
+        "KeyMaterials": {
+            "cryptoAlg": "ECDH",
+            "curve": "curve25519",
+            "params": "",
+            "DHPublicKey": {
+                "expiry": expiry.isoformat(timespec="milliseconds").replace(
+                    "+00:00", "Z"
+                ),
+                "Parameter": "",
+                "KeyValue": curve25519_utils.encode_public_key(
+                    curve25519_utils.get_public_key(private_key)
+                ),
+            },
+        },
+    }
 
-    if response:
-        return response
-    logging.error("Failed to generate ecc key pair.")
-    return None
+
+def _derive_cipher_and_iv(
+    our_private_key: str,
+    remote_public_key: str,
+    our_nonce: str,
+    remote_nonce: str,
+) -> tuple[aead.AESGCM, bytes]:
+    """Derives the AES-GCM cipher and IV shared with the remote party.
+
+    Nothing is cached, so keys do not outlive the FI session using them.
+    """
+    shared_secret = curve25519_utils.compute_shared_secret(
+        private_key=curve25519_utils.load_private_key(our_private_key),
+        remote_public_key=curve25519_utils.load_public_key(remote_public_key),
+    )
+    xor_of_nonces = bytes(
+        our_nonce_byte ^ remote_nonce_byte
+        for our_nonce_byte, remote_nonce_byte in zip(
+            base64.b64decode(our_nonce), base64.b64decode(remote_nonce)
+        )
+    )
+    if len(xor_of_nonces) < 20:
+        raise ValueError("Nonces are too short to derive salt and IV.")
+    salt, iv = xor_of_nonces[:20], xor_of_nonces[-12:]
+    key = hkdf.HKDF(
+        algorithm=hashes.SHA256(), length=32, salt=salt, info=None
+    ).derive(shared_secret)
+    return aead.AESGCM(key), iv
+
+
+def _get_cipher_and_iv(
+    our_private_key: str,
+    remote_key_material: dict,
+    our_nonce: str,
+    remote_nonce: str,
+) -> tuple[aead.AESGCM, bytes]:
+    """Gets the AES-GCM cipher and IV for given key material and nonces."""
+    return _derive_cipher_and_iv(
+        our_private_key=our_private_key,
+        remote_public_key=remote_key_material["DHPublicKey"]["KeyValue"],
+        our_nonce=our_nonce,
+        remote_nonce=remote_nonce,
+    )
 
 
 def encrypt_fi_data(
@@ -36,34 +103,67 @@ def encrypt_fi_data(
     remote_nonce: str,
 ) -> Optional[str]:
     """Encrypts FI data using shared key generated using provided key pair."""
-    # Encode the raw_data using b64 encoding
-    b64_data = base64.b64encode(raw_data.encode()).decode()
-
-    payload = {
-        "base64Data": b64_data,
-        "base64RemoteNonce": remote_nonce,
-        "base64YourNonce": our_nonce,
-        "ourPrivateKey": our_private_key,
-        "remoteKeyMaterial": remote_key_material,
-    }
+    # Encode the raw_data using b64 encoding, as sent to rahasya.
+    b64_data = base64.b64encode(raw_data.encode())
+
+    try:
+        cipher, iv = _get_cipher_and_iv(
+            our_private_key=our_private_key,
+            remote_key_material=remote_key_material,
+            our_nonce=our_nonce,
+            remote_nonce=remote_nonce,
+        )
+        return base64.b64encode(cipher.encrypt(iv, b64_data, None)).decode()
+    except (KeyError, TypeError, ValueError) as e:
+        # Malformed key material or nonces.
+        logging.error(f"Failed to encrypt data: {e}")
+        return None
 
-    headers = {
-        "accept": "application/json",
-        "Content-Type": "application/json",
-    }
 
-    response = api_utils.make_request(
-        base_url=sahamati_rahasya_constants.HOST,
-        method="POST",
-        endpoint="/ecc/v1/encrypt",
-        headers=headers,
-        payload=payload,
-    )
+def _decrypt(
+    cipher: aead.AESGCM, iv: bytes, encrypted_data: str
+) -> Optional[str]:
+    """Decrypts FI data using a derived cipher and IV."""
+    try:
+        # Decrypted data is the b64 string of the original message.
+        decrypted_fi_data_encoded = cipher.decrypt(
+            iv, base64.b64decode(encrypted_data), None
+        )
+        return base64.b64decode(decrypted_fi_data_encoded).decode()
+    except (TypeError, ValueError, exceptions.InvalidTag) as e:
+        logging.error(f"Failed to decrypt data: {e!r}")
+        return None
+
 
-    if response and "base64Data" in response:
-        return response["base64Data"]
-    logging.error("Failed to encrypt data.")
-    return None
+def decrypt_fi_data_blocks(
+    encrypted_data_blocks: list[str],
+    our_private_key: str,
+    remote_key_material: dict,
+    our_nonce: str,
+    remote_nonce: str,
+) -> list[Optional[str]]:
+    """Decrypts data blocks of an FI response sharing the key material.
+
+    The key agreement is done once for all the data blocks.
+
+    Returns:
+        Decrypted data of each block, or None for blocks which could not be
+        decrypted.
+    """
+    try:
+        cipher, iv = _get_cipher_and_iv(
+            our_private_key=our_private_key,
+            remote_key_material=remote_key_material,
+            our_nonce=our_nonce,
+            remote_nonce=remote_nonce,
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        logging.error(f"Failed to decrypt data: {e!r}")
+        return [None] * len(encrypted_data_blocks)
+    return [
+        _decrypt(cipher=cipher, iv=iv, encrypted_data=encrypted_data)
+        for encrypted_data in encrypted_data_blocks
+    ]
 
 
 def decrypt_fi_data(
@@ -74,41 +174,13 @@ def decrypt_fi_data(
     remote_nonce: str,
 ) -> Optional[str]:
     """Decrypts FI data using shared key generated using provided key pair."""
-    payload = {
-        "base64Data": encrypted_data,
-        "base64RemoteNonce": remote_nonce,
-        "base64YourNonce": our_nonce,
-        "ourPrivateKey": our_private_key,
-        "remoteKeyMaterial": remote_key_material,
-    }
-
-    headers = {
-        "accept": "application/json",
-        "Content-Type": "application/json",
-    }
-
-    response = api_utils.make_request(
-        base_url=sahamati_rahasya_constants.HOST,
-        method="POST",
-        endpoint="/ecc/v1/decrypt",
-        headers=headers,
-        payload=payload,
-    )
-
-    if response and "base64Data" in response:
-        # Step 1: get the decrypted b64 string.
-        decrypted_fi_data_b64 = response["base64Data"]
-        decrypted_fi_data_encoded = base64.b64decode(
-            decrypted_fi_data_b64
-        ).decode()
-
-        # Step 2: Decode the b64 string to get the original message.
-        decrypted_fi_data_raw = base64.b64decode(
-            decrypted_fi_data_encoded
-        ).decode()
-        return decrypted_fi_data_raw
-    logging.error("Failed to encrypt data.")
-    return None
+    return decrypt_fi_data_blocks(
+        encrypted_data_blocks=[encrypted_data],
+        our_private_key=our_private_key,
+        remote_key_material=remote_key_material,
+        our_nonce=our_nonce,
+        remote_nonce=remote_nonce,
+    )[0]
 
 
 # Helper methods
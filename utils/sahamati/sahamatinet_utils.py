@@ -1,13 +1,21 @@
 """Helper library to consume SahamatiNet APIs."""
 
 import logging
+import threading
 from typing import Optional
-
-import requests
+from urllib import parse
 
 from constants import sahamatinet_constants
-from utils import api_utils
-from utils.sahamati import sahamati_rahasya_utils
+from utils import api_utils, http_retry_utils
+from utils.sahamati import ephemeral_key_pool
+
+# SahamatiNet APIs are called with POST. Token calls, reads and simulator
+# setup are safe to repeat after any failure.
+_RETRY_POLICY = http_retry_utils.RetryPolicy(retry_non_idempotent=True)
+
+# Requests which create a consent or FI session may create another one when
+# repeated, so they are only retried when known not to be processed.
+_CREATE_RETRY_POLICY = http_retry_utils.RetryPolicy()
 
 # Token Service [IAM]
 
@@ -17,8 +25,8 @@ def get_sahamatinet_user_token(
 ) -> Optional[str]:
     """Generates sahamatinet user token."""
     payload = "username=%s&password=%s" % (
-        requests.utils.quote(sahamatinet_user_name),
-        requests.utils.quote(sahamatinet_password),
+        parse.quote(sahamatinet_user_name),
+        parse.quote(sahamatinet_password),
     )
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     response = api_utils.make_request(
@@ -27,6 +35,7 @@ def get_sahamatinet_user_token(
         endpoint="/iam/v1/user/token/generate",
         payload=payload,
         headers=headers,
+        retry_policy=_RETRY_POLICY,
     )
 
     if response and "accessToken" in response:
@@ -53,6 +62,7 @@ def get_sahamatinet_member_secret(
         endpoint="/iam/v1/entity/secret/read",
         payload=payload,
         headers=headers,
+        retry_policy=_RETRY_POLICY,
     )
 
     if response and "secret" in response:
@@ -66,8 +76,8 @@ def get_sahamatinet_member_token(
 ) -> Optional[str]:
     """Generates sahamatinet member token."""
     payload = "id=%s&secret=%s" % (
-        requests.utils.quote(sahamatinet_member_id),
-        requests.utils.quote(sahamatinet_member_secret),
+        parse.quote(sahamatinet_member_id),
+        parse.quote(sahamatinet_member_secret),
     )
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
@@ -77,6 +87,7 @@ def get_sahamatinet_member_token(
         endpoint="/iam/v1/entity/token/generate",
         payload=payload,
         headers=headers,
+        retry_policy=_RETRY_POLICY,
     )
 
     if response and "accessToken" in response:
@@ -87,6 +98,22 @@ def get_sahamatinet_member_token(
 
 # Proxy API - Sandbox (FIU -> AA)
 
+# Signs proxy requests, created on first use to import the key only once.
+_jws_signer = None
+_jws_signer_lock = threading.Lock()
+
+
+def _get_jws_signer() -> api_utils.JwsSigner:
+    """Gets the signer of sahamatinet proxy requests."""
+    global _jws_signer
+    if _jws_signer is None:
+        with _jws_signer_lock:
+            if _jws_signer is None:
+                _jws_signer = api_utils.JwsSigner(
+                    private_key=sahamatinet_constants.RSA_PRIVATE_KEY_JWK
+                )
+    return _jws_signer
+
 
 def create_consent(
     phone_number: str,
@@ -133,11 +160,9 @@ def create_consent(
             "Frequency": {"unit": "DAY", "value": 100},
         },
     }
+    body, signature = _get_jws_signer().sign(payload=payload)
     headers = {
-        "x-jws-signature": api_utils.get_detached_jws(
-            payload=payload,
-            private_key=sahamatinet_constants.RSA_PRIVATE_KEY_JWK,
-        ),
+        "x-jws-signature": signature,
         "Content-Type": "application/json",
         "x-request-meta": api_utils.dict_to_b64(
             data={"recipient-id": "saafe-sandbox"}
@@ -148,8 +173,9 @@ def create_consent(
         base_url=sahamatinet_constants.HOST,
         method="POST",
         endpoint="/proxy/v2/Consent",
-        payload=payload,
+        payload=body,
         headers=headers,
+        retry_policy=_CREATE_RETRY_POLICY,
     )
 
     if response and "ConsentHandle" in response:
@@ -168,11 +194,9 @@ def fetch_consent(
         "txnid": api_utils.generate_transaction_id(),
         "consentId": consent_id,
     }
+    body, signature = _get_jws_signer().sign(payload=payload)
     headers = {
-        "x-jws-signature": api_utils.get_detached_jws(
-            payload=payload,
-            private_key=sahamatinet_constants.RSA_PRIVATE_KEY_JWK,
-        ),
+        "x-jws-signature": signature,
         "Content-Type": "application/json",
         "x-request-meta": api_utils.dict_to_b64(
             data={"recipient-id": "saafe-sandbox"}
@@ -184,8 +208,9 @@ def fetch_consent(
         base_url=sahamatinet_constants.HOST,
         method="POST",
         endpoint="/proxy/v2/Consent/fetch",
-        payload=payload,
+        payload=body,
         headers=headers,
+        retry_policy=_RETRY_POLICY,
     )
 
     if response and "signedConsent" in response:
@@ -207,10 +232,8 @@ def create_fi_request(
 
     It also returns the private nonce and private key for decrypting data.
     """
-    # Generate public private key pair for e2e encrypted data fetching.
-    public_private_key_pair = (
-        sahamati_rahasya_utils.get_public_private_key_pair_for_fi_request()
-    )
+    # Draw a single use key pair for e2e encrypted data fetching.
+    public_private_key_pair = ephemeral_key_pool.get_key_pair_for_fi_request()
     if not public_private_key_pair:
         return None
     our_nonce, our_private_key, our_public_key_material = (
@@ -232,11 +255,9 @@ def create_fi_request(
         "KeyMaterial": our_public_key_material,
     }
 
+    body, signature = _get_jws_signer().sign(payload=payload)
     headers = {
-        "x-jws-signature": api_utils.get_detached_jws(
-            payload=payload,
-            private_key=sahamatinet_constants.RSA_PRIVATE_KEY_JWK,
-        ),
+        "x-jws-signature": signature,
         "Content-Type": "application/json",
         "x-request-meta": api_utils.dict_to_b64(
             data={"recipient-id": "saafe-sandbox"}
@@ -248,8 +269,9 @@ def create_fi_request(
         base_url=sahamatinet_constants.HOST,
         method="POST",
         endpoint="/proxy/v2/FI/request",
-        payload=payload,
+        payload=body,
         headers=headers,
+        retry_policy=_CREATE_RETRY_POLICY,
     )
 
     if response and "sessionId" in response:
@@ -264,8 +286,19 @@ def fi_fetch(
     session_id: str,
     sahamatinet_member_token: str,
     mock_params: dict = {},
+    retry_policy: Optional[http_retry_utils.RetryPolicy] = None,
 ) -> Optional[dict]:
-    """Fetches data if available for given session id."""
+    """Fetches data if available for given session id.
+
+    Args:
+        accounts: Link reference numbers of the accounts.
+        fip_id: Id of FIP holding the accounts.
+        session_id: Id of the FI request session.
+        sahamatinet_member_token: Token of sahamatinet member.
+        mock_params: Scenario and recipient of simulated responses.
+        retry_policy: Decides retries of the request, such as none for
+            fetches which are already polled.
+    """
     payload = {
         "ver": "2.0.0",
         "timestamp": api_utils.get_current_utc_time(),
@@ -274,11 +307,9 @@ def fi_fetch(
         "fipId": fip_id,
         "linkRefNumber": [{"id": link_ref_num} for link_ref_num in accounts],
     }
+    body, signature = _get_jws_signer().sign(payload=payload)
     headers = {
-        "x-jws-signature": api_utils.get_detached_jws(
-            payload=payload,
-            private_key=sahamatinet_constants.RSA_PRIVATE_KEY_JWK,
-        ),
+        "x-jws-signature": signature,
         "Content-Type": "application/json",
         "x-scenario-id": mock_params.get("x-scenario-id", "Ok"),
         "x-request-meta": api_utils.dict_to_b64(
@@ -295,8 +326,9 @@ def fi_fetch(
         base_url=sahamatinet_constants.HOST,
         method="POST",
         endpoint="/proxy/v2/FI/fetch",
-        payload=payload,
+        payload=body,
         headers=headers,
+        retry_policy=retry_policy or _RETRY_POLICY,
     )
 
     if response:
@@ -323,6 +355,7 @@ def add_mock_response(
         endpoint="/simulate/v2/response/add",
         payload=mock_response_data,
         headers=headers,
+        retry_policy=_RETRY_POLICY,
     )
 
     if response:
@@ -346,6 +379,7 @@ def update_mock_response(
         endpoint="/simulate/v2/response/update",
         payload=mock_response_data,
         headers=headers,
+        retry_policy=_RETRY_POLICY,
     )
 
     if response:
@@ -0,0 +1,66 @@
+"""Helper library to buffer caller audio without reallocations."""
+
+from typing import Union
+
+
+class PcmRingBuffer:
+    """Preallocated ring buffer holding the latest PCM audio of an utterance.
+
+    Frames are written in place and the buffered audio is read as a
+    `memoryview` over the same memory. When an utterance exceeds the
+    capacity, the oldest audio is overwritten.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Allocates the buffer for given max size of utterance in bytes."""
+        self.max_bytes = max_bytes
+        self._buffer = bytearray(max_bytes)
+        self._view = memoryview(self._buffer)
+        self._write_index = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Returns the number of buffered bytes."""
+        return self._size
+
+    def write(self, audio_frame: Union[bytes, bytearray, memoryview]):
+        """Copies an audio frame at the end of the buffer."""
+        audio_frame = memoryview(audio_frame).cast("B")
+        frame_size = len(audio_frame)
+        if frame_size >= self.max_bytes:
+            # Keep only the latest audio which fits in the buffer.
+            self._view[:] = audio_frame[frame_size - self.max_bytes :]
+            self._write_index = 0
+            self._size = self.max_bytes
+            return
+
+        end_index = self._write_index + frame_size
+        if end_index <= self.max_bytes:
+            self._view[self._write_index : end_index] = audio_frame
+        else:
+            # Wrap around and overwrite the oldest audio.
+            split = self.max_bytes - self._write_index
+            self._view[self._write_index :] = audio_frame[:split]
+            self._view[: frame_size - split] = audio_frame[split:]
+        self._write_index = end_index % self.max_bytes
+        self._size = min(self._size + frame_size, self.max_bytes)
+
+    def read(self) -> memoryview:
+        """Returns a view of buffered audio in chronological order.
+
+        The view is valid until the next write into the buffer.
+        """
+        if self._size == self.max_bytes and self._write_index != 0:
+            # Rotate once so that the oldest audio is at the start. This
+            # copy only happens for utterances longer than the capacity.
+            rotated = bytes(self._view[self._write_index :]) + bytes(
+                self._view[: self._write_index]
+            )
+            self._view[:] = rotated
+            self._write_index = 0
+        return self._view[: self._size]
+
+    def reset(self):
+        """Discards the buffered audio without releasing the memory."""
+        self._write_index = 0
+        self._size = 0
@@ -0,0 +1,162 @@
+"""Helper library to cache rendered speech and translations on disk.
+
+Entries are content addressed by a hash of every parameter which changes the
+output, so a change in text, language, voice or model never serves stale
+audio.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional
+
+from constants import voice_assistant_constants
+
+
+def _cache_key(*parts) -> str:
+    """Hashes the parameters which identify a cache entry."""
+    return hashlib.sha256(
+        "\x1f".join(str(part) for part in parts).encode("utf-8")
+    ).hexdigest()
+
+
+def _cache_path(key: str, extension: str) -> str:
+    """Gets the path of a cache entry."""
+    return os.path.join(
+        voice_assistant_constants.AUDIO_CACHE_DIR,
+        key[:2],
+        f"{key}.{extension}",
+    )
+
+
+def _read_entry(path: str) -> Optional[bytes]:
+    """Reads a cache entry if it exists."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_entry(path: str, data: bytes) -> bool:
+    """Writes a cache entry atomically so readers never see partial data.
+
+    Failing to write is logged and ignored, since the cache is optional.
+
+    Returns:
+        True if the entry is written, else False.
+    """
+    temp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temporary file, as threads may write the same entry at once.
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".tmp"
+        )
+        with os.fdopen(file_descriptor, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        logging.error(f"Error writing cache entry {path}: {e}")
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+
+def speech_cache_key(input_text: str, target_language_code: str) -> str:
+    """Gets the cache key of speech rendered by text to speech."""
+    return _cache_key(
+        "tts",
+        input_text,
+        target_language_code,
+        voice_assistant_constants.TTS_SPEAKER,
+        voice_assistant_constants.TTS_PITCH,
+        voice_assistant_constants.TTS_PACE,
+        voice_assistant_constants.TTS_LOUDNESS,
+        voice_assistant_constants.TTS_MODEL,
+        voice_assistant_constants.RATE,
+    )
+
+
+def translation_cache_key(
+    input_text: str, source_language_code: str, target_language_code: str
+) -> str:
+    """Gets the cache key of text translated by text to text."""
+    return _cache_key(
+        "translate",
+        input_text,
+        source_language_code,
+        target_language_code,
+        voice_assistant_constants.TRANSLATION_MODE,
+        voice_assistant_constants.TRANSLATION_MODEL,
+    )
+
+
+def load_speech(
+    input_text: str, target_language_code: str, audio_format: str = "pcm"
+) -> Optional[bytes]:
+    """Loads audio of text from cache.
+
+    Args:
+        input_text: Text which is spoken.
+        target_language_code: Language of the text.
+        audio_format: Either "pcm" for 16 bit PCM or "ulaw" for µ-law audio.
+    """
+    key = speech_cache_key(
+        input_text=input_text, target_language_code=target_language_code
+    )
+    return _read_entry(path=_cache_path(key=key, extension=audio_format))
+
+
+def save_speech(
+    input_text: str,
+    target_language_code: str,
+    audio: bytes,
+    audio_format: str = "pcm",
+):
+    """Saves audio of text in cache in given format."""
+    key = speech_cache_key(
+        input_text=input_text, target_language_code=target_language_code
+    )
+    if _write_entry(
+        path=_cache_path(key=key, extension=audio_format), data=audio
+    ):
+        logging.info(
+            f"Cached {audio_format} speech {key} in {target_language_code}."
+        )
+
+
+def load_translation(
+    input_text: str, source_language_code: str, target_language_code: str
+) -> Optional[str]:
+    """Loads translated text from cache."""
+    key = translation_cache_key(
+        input_text=input_text,
+        source_language_code=source_language_code,
+        target_language_code=target_language_code,
+    )
+    translated_text = _read_entry(path=_cache_path(key=key, extension="txt"))
+    if translated_text is None:
+        return None
+    return translated_text.decode("utf-8")
+
+
+def save_translation(
+    input_text: str,
+    source_language_code: str,
+    target_language_code: str,
+    translated_text: str,
+):
+    """Saves translated text in cache."""
+    key = translation_cache_key(
+        input_text=input_text,
+        source_language_code=source_language_code,
+        target_language_code=target_language_code,
+    )
+    if _write_entry(
+        path=_cache_path(key=key, extension="txt"),
+        data=translated_text.encode("utf-8"),
+    ):
+        logging.info(f"Cached translation {key} in {target_language_code}.")
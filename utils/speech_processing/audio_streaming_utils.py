@@ -1,10 +1,9 @@
 """Helper library for audio streaming."""
 
-import audioop
 import base64
 import json
 import logging
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import fastapi
 import noisereduce
@@ -13,25 +12,71 @@ import numpy as np
 from constants import voice_assistant_constants
 
 
+def _build_ulaw_to_pcm_table() -> np.ndarray:
+    """Builds table mapping each G.711 µ-law byte to a 16 bit PCM sample."""
+    ulaw = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (ulaw & 0x70) >> 4
+    magnitude = (((ulaw & 0x0F) << 3) + 0x84) << exponent
+    pcm = np.where(ulaw & 0x80, 0x84 - magnitude, magnitude - 0x84)
+    return pcm.astype(np.int16)
+
+
+def _build_pcm_to_ulaw_table() -> np.ndarray:
+    """Builds table mapping each 16 bit PCM sample to a G.711 µ-law byte.
+
+    The table is indexed by the PCM sample reinterpreted as unsigned 16 bit
+    integer.
+    """
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    pcm = pcm >> 2  # µ-law encodes 14 bit samples.
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), 8159) + 0x21
+    segment = np.searchsorted(
+        np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]),
+        magnitude,
+    )
+    ulaw = np.where(
+        segment < 8,
+        (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F),
+        0x7F,  # Magnitude is beyond the last segment.
+    )
+    return (ulaw ^ mask).astype(np.uint8)
+
+
+# Lookup tables for G.711 µ-law codec.
+ULAW_TO_PCM_TABLE = _build_ulaw_to_pcm_table()
+PCM_TO_ULAW_TABLE = _build_pcm_to_ulaw_table()
+
+
+def encode_ulaw(raw_audio_bytes: bytes) -> bytes:
+    """Encodes 16 bit PCM audio to µ-law audio."""
+    # Trailing odd byte is not a complete sample.
+    pcm_audio = np.frombuffer(
+        raw_audio_bytes, np.uint16, count=len(raw_audio_bytes) // 2
+    )
+    return PCM_TO_ULAW_TABLE.take(pcm_audio).tobytes()
+
+
+def decode_ulaw(ulaw_audio_bytes: bytes) -> np.ndarray:
+    """Decodes µ-law audio to an array of 16 bit PCM samples."""
+    return ULAW_TO_PCM_TABLE.take(np.frombuffer(ulaw_audio_bytes, np.uint8))
+
+
+def decode_ulaw_payload(ulaw_audio: str) -> np.ndarray:
+    """Decodes base64 µ-law payload to an array of 16 bit PCM samples."""
+    return decode_ulaw(ulaw_audio_bytes=base64.b64decode(ulaw_audio))
+
+
 def convert_to_ulaw(raw_audio_bytes: bytes) -> str:
     """Converts the raw audio from PCM format to µ-law format."""
-    ulaw_audio = audioop.lin2ulaw(
-        raw_audio_bytes, voice_assistant_constants.BYTES_PER_SAMPLE
-    )
+    ulaw_audio = encode_ulaw(raw_audio_bytes=raw_audio_bytes)
     audio_base64 = base64.b64encode(ulaw_audio).decode("utf-8")
     return audio_base64
 
 
 def convert_to_raw_audio_bytes(ulaw_audio: str) -> bytes:
     """Converts the µ-law encoded audio to PCM bytes format ."""
-    # Decode the base64 audio data
-    ulaw_audio_bytes = base64.b64decode(ulaw_audio)
-
-    # Convert µ-law to raw PCM
-    pcm_data = audioop.ulaw2lin(
-        ulaw_audio_bytes, voice_assistant_constants.BYTES_PER_SAMPLE
-    )
-    return pcm_data
+    return decode_ulaw_payload(ulaw_audio=ulaw_audio).tobytes()
 
 
 def reduce_noise_from_audio(raw_audio_bytes: bytes) -> bytes:
@@ -102,6 +147,61 @@ async def send_audio_to_stream(
     logging.info("Audio sent.")
 
 
+def split_into_ulaw_frames(ulaw_audio_bytes: bytes) -> list[str]:
+    """Splits µ-law audio into base64 encoded 20 ms media payloads."""
+    frame_size = voice_assistant_constants.CHUNK_LENGTH  # 1 byte per sample
+    return [
+        base64.b64encode(ulaw_audio_bytes[start : start + frame_size]).decode(
+            "utf-8"
+        )
+        for start in range(0, len(ulaw_audio_bytes), frame_size)
+    ]
+
+
+async def send_ulaw_frames_to_stream(
+    ulaw_frames: list[str],
+    websocket: fastapi.WebSocket,
+    stream_sid: str,
+    on_first_frame_sent: Optional[Callable[[], Any]] = None,
+):
+    """Sends base64 encoded µ-law media payloads through websocket.
+
+    Messages are built from a template instead of serialising a dict for
+    every frame.
+
+    Args:
+        ulaw_frames: Base64 encoded media payloads.
+        websocket: Websocket connection of the media stream.
+        stream_sid: Id of the media stream.
+        on_first_frame_sent: Called once the first frame is sent.
+    """
+    message_prefix = (
+        f'{{"event": "media", "streamSid": {json.dumps(stream_sid)}, '
+        '"media": {"payload": "'
+    )
+    for index, ulaw_frame in enumerate(ulaw_frames):
+        await websocket.send_text(message_prefix + ulaw_frame + '"}}')
+        if index == 0 and on_first_frame_sent is not None:
+            on_first_frame_sent()
+
+
+async def send_audio_frames_to_stream(
+    raw_audio_bytes: bytes,
+    websocket: fastapi.WebSocket,
+    stream_sid: str,
+    on_first_frame_sent: Optional[Callable[[], Any]] = None,
+):
+    """Sends audio through websocket connection in 20 ms media frames."""
+    await send_ulaw_frames_to_stream(
+        ulaw_frames=split_into_ulaw_frames(
+            ulaw_audio_bytes=encode_ulaw(raw_audio_bytes=raw_audio_bytes)
+        ),
+        websocket=websocket,
+        stream_sid=stream_sid,
+        on_first_frame_sent=on_first_frame_sent,
+    )
+
+
 async def send_mark_event_to_stream(
     websocket: fastapi.WebSocket, stream_sid: str, mark_tag: str = "ai-message"
 ):
@@ -114,3 +214,11 @@ async def send_mark_event_to_stream(
         }
     )
     logging.info(f"Sent mark event with tag: {mark_tag}.")
+
+
+async def send_clear_event_to_stream(
+    websocket: fastapi.WebSocket, stream_sid: str
+):
+    """Sends clear event to stream to drop audio which is not played yet."""
+    await websocket.send_json({"event": "clear", "streamSid": stream_sid})
+    logging.info("Sent clear event.")
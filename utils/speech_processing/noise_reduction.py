@@ -0,0 +1,164 @@
+"""Helper library for streaming noise reduction of call audio."""
+
+import collections
+
+import numpy as np
+
+
+class StreamingDenoiser:
+    """Stateful spectral gating denoiser for a stream of PCM audio frames.
+
+    Audio is processed with a short time fourier transform of 50% overlapping
+    square root hann windows. The noise profile and the overlap-add state are
+    carried across frames, so every output frame has the same length as the
+    input frame delayed by `2 * hop_length` samples.
+
+    The noise profile may rise to track louder noise, but not beyond a
+    headroom above its own minimum over a long window. Steady signal such as
+    a held vowel or a tone is thus not learnt as noise within that window.
+    """
+
+    def __init__(
+        self,
+        n_fft: int = 256,
+        prop_decrease: float = 0.8,
+        threshold: float = 1.5,
+        noise_init_frames: int = 10,
+        noise_smoothing: float = 0.95,
+        noise_rise_rate: float = 1.005,
+        noise_floor_blocks: int = 8,
+        noise_floor_block_windows: int = 250,
+        noise_floor_headroom: float = 4.0,
+    ) -> None:
+        """Initialise the state of denoiser.
+
+        Args:
+            n_fft: Length of the fourier transform window in samples.
+            prop_decrease: Proportion by which noise is reduced.
+            threshold: Ratio of magnitude to noise profile above which a
+                frequency bin is considered as signal.
+            noise_init_frames: Number of initial windows used to estimate
+                the noise profile.
+            noise_smoothing: Smoothing factor of the running noise profile.
+            noise_rise_rate: Rate at which noise profile rises per window
+                for bins above the threshold, to track louder noise.
+            noise_floor_blocks: Number of blocks of windows over which the
+                minimum of noise profile is tracked.
+            noise_floor_block_windows: Number of windows in each block.
+            noise_floor_headroom: Ratio of noise profile to its minimum over
+                the tracked blocks above which it does not rise.
+        """
+        self.n_fft = n_fft
+        self.hop_length = n_fft // 2
+        self.prop_decrease = prop_decrease
+        self.threshold = threshold
+        self.noise_init_frames = noise_init_frames
+        self.noise_smoothing = noise_smoothing
+        self.noise_rise_rate = noise_rise_rate
+        self.noise_floor_block_windows = noise_floor_block_windows
+        self.noise_floor_headroom = noise_floor_headroom
+
+        # Square root hann windows sum to one when overlapped by 50%.
+        self.window = np.sqrt(np.hanning(n_fft + 1)[:-1]).astype(np.float32)
+        self.noise_profile = np.zeros(n_fft // 2 + 1, dtype=np.float32)
+        self.num_noise_frames = 0
+
+        # Minimum of noise profile in the current and the previous blocks.
+        self._noise_floor = np.full(n_fft // 2 + 1, np.inf, dtype=np.float32)
+        self._noise_floor_blocks = collections.deque(
+            maxlen=noise_floor_blocks - 1
+        )
+        self._noise_floor_block_size = 0
+        self._previous_noise_floor = np.full_like(self._noise_floor, np.inf)
+
+        self._input_buffer = np.zeros(self.hop_length, dtype=np.float32)
+        self._overlap = np.zeros(self.hop_length, dtype=np.float32)
+        self._output_buffer = np.zeros(self.hop_length, dtype=np.float32)
+
+    def process(self, raw_audio_bytes: bytes) -> bytes:
+        """Reduces noise from a PCM frame and returns a frame of same size."""
+        audio = np.frombuffer(raw_audio_bytes, np.int16).astype(np.float32)
+        self._input_buffer = np.concatenate((self._input_buffer, audio))
+
+        num_windows = (len(self._input_buffer) - self.hop_length) // (
+            self.hop_length
+        )
+        if num_windows > 0:
+            windows = np.lib.stride_tricks.sliding_window_view(
+                self._input_buffer, self.n_fft
+            )[:: self.hop_length][:num_windows]
+            self._input_buffer = self._input_buffer[
+                num_windows * self.hop_length :
+            ]
+            self._output_buffer = np.concatenate(
+                (self._output_buffer, self._denoise_windows(windows))
+            )
+
+        output = self._output_buffer[: len(audio)]
+        self._output_buffer = self._output_buffer[len(audio) :]
+        if len(output) < len(audio):
+            # Delay output further for frames larger than expected.
+            output = np.pad(output, (len(audio) - len(output), 0))
+        return np.clip(output, -32768, 32767).astype(np.int16).tobytes()
+
+    def _denoise_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Applies spectral gating on windows and overlap-adds them."""
+        spectrum = np.fft.rfft(windows * self.window, axis=1)
+        magnitude = np.abs(spectrum)
+        self._update_noise_profile(magnitude=magnitude)
+
+        # Keep bins well above noise and attenuate the rest smoothly.
+        signal_ratio = magnitude / (self.threshold * self.noise_profile + 1e-6)
+        mask = np.clip(signal_ratio - 1, 0, 1)
+        gain = 1 - self.prop_decrease * (1 - mask)
+
+        denoised = (
+            np.fft.irfft(spectrum * gain, n=self.n_fft, axis=1) * self.window
+        )
+
+        # Overlap-add first half of each window with second half of previous.
+        first_halves = denoised[:, : self.hop_length]
+        second_halves = denoised[:, self.hop_length :]
+        previous_halves = np.vstack((self._overlap, second_halves[:-1]))
+        self._overlap = second_halves[-1].copy()
+        return (first_halves + previous_halves).ravel()
+
+    def _update_noise_profile(self, magnitude: np.ndarray):
+        """Updates running noise profile with the magnitude of new windows."""
+        for window_magnitude in magnitude:
+            if self.num_noise_frames < self.noise_init_frames:
+                # Average initial windows to bootstrap the noise profile.
+                self.num_noise_frames += 1
+                self.noise_profile += (
+                    window_magnitude - self.noise_profile
+                ) / self.num_noise_frames
+                continue
+            # Track bins which look like noise and let others rise slowly,
+            # up to a headroom above the noise floor of the recent blocks.
+            is_noise = window_magnitude < self.threshold * self.noise_profile
+            self.noise_profile = np.where(
+                is_noise,
+                self.noise_smoothing * self.noise_profile
+                + (1 - self.noise_smoothing) * window_magnitude,
+                np.minimum(
+                    self.noise_profile * self.noise_rise_rate,
+                    self.noise_floor_headroom
+                    * np.minimum(
+                        self._noise_floor, self._previous_noise_floor
+                    ),
+                ),
+            ).astype(np.float32)
+            self._update_noise_floor()
+
+    def _update_noise_floor(self):
+        """Tracks minimum of noise profile in blocks of windows."""
+        self._noise_floor = np.minimum(self._noise_floor, self.noise_profile)
+        self._noise_floor_block_size += 1
+        if self._noise_floor_block_size >= self.noise_floor_block_windows:
+            # Start a new block and forget the oldest one.
+            self._noise_floor_blocks.append(self._noise_floor)
+            self._previous_noise_floor = np.min(
+                self._noise_floor_blocks, axis=0
+            )
+            self._noise_floor = self.noise_profile.copy()
+            self._noise_floor_block_size = 0
@@ -1,15 +1,27 @@
 """Helper library to consume SarvamAI's speech processing APIs."""
 
+import asyncio
 import base64
 import io
 import logging
 import wave
-from typing import Optional
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Optional,
+    Union,
+)
 
 from constants import voice_assistant_constants
-from utils import api_utils
+from utils import api_utils, http_retry_utils
+from utils.speech_processing import speech_executor
+from utils.text_processing import text_utils
 from voice_assistant_modules.conversation_flows import base_conversation_flow
 
+# Sarvam APIs only compute a result, so all their calls are safe to repeat.
+_RETRY_POLICY = http_retry_utils.RetryPolicy(retry_non_idempotent=True)
+
 
 def chunk_text(text: str, max_length: int = 450) -> list[str]:
     """Chunks text into a list of 500-character chunks."""
@@ -34,34 +46,40 @@ def chunk_text(text: str, max_length: int = 450) -> list[str]:
     return chunks
 
 
-def text_to_speech(
+def _get_headers() -> dict[str, str]:
+    """Gets headers to authenticate with Sarvam APIs."""
+    return {"API-Subscription-Key": voice_assistant_constants.SARVAM_API_KEY}
+
+
+def _get_text_to_speech_request(
     input_text: str, target_language_code: str
-) -> Optional[bytes]:
-    """Converts text string into speech in target language."""
+) -> dict[str, Any]:
+    """Gets arguments of the request to convert text to speech."""
     payload = {
         "inputs": chunk_text(text=input_text)[:3],  # API supports max 3 chunks
         "target_language_code": target_language_code,
-        "speaker": "meera",
-        "pitch": 0,
-        "pace": 1.1,
-        "loudness": 1.5,
+        "speaker": voice_assistant_constants.TTS_SPEAKER,
+        "pitch": voice_assistant_constants.TTS_PITCH,
+        "pace": voice_assistant_constants.TTS_PACE,
+        "loudness": voice_assistant_constants.TTS_LOUDNESS,
         "speech_sample_rate": voice_assistant_constants.RATE,
         "enable_preprocessing": True,
-        "model": "bulbul:v1",
+        "model": voice_assistant_constants.TTS_MODEL,
     }
-
-    headers = {
-        "API-Subscription-Key": voice_assistant_constants.SARVAM_API_KEY
+    return {
+        "base_url": voice_assistant_constants.SARVAM_BASE_URL,
+        "method": "POST",
+        "endpoint": "text-to-speech",
+        "headers": _get_headers(),
+        "payload": payload,
+        "retry_policy": _RETRY_POLICY,
     }
 
-    response = api_utils.make_request(
-        base_url=voice_assistant_constants.SARVAM_BASE_URL,
-        method="POST",
-        endpoint="text-to-speech",
-        headers=headers,
-        payload=payload,
-    )
 
+def _parse_text_to_speech_response(
+    response: Optional[dict], input_text: str
+) -> Optional[bytes]:
+    """Gets the speech from the response of text to speech API."""
     if response and "audios" in response:
         audio_base64 = "".join(response["audios"])
         audio_data = base64.b64decode(audio_base64)
@@ -70,45 +88,111 @@ def text_to_speech(
     return None
 
 
-def text_to_text(
+def text_to_speech(
+    input_text: str, target_language_code: str
+) -> Optional[bytes]:
+    """Converts text string into speech in target language."""
+    response = api_utils.make_request(
+        **_get_text_to_speech_request(
+            input_text=input_text, target_language_code=target_language_code
+        )
+    )
+    return _parse_text_to_speech_response(
+        response=response, input_text=input_text
+    )
+
+
+async def async_text_to_speech(
+    input_text: str, target_language_code: str
+) -> Optional[bytes]:
+    """Converts text string into speech from event loop."""
+    response = await api_utils.async_make_request(
+        **_get_text_to_speech_request(
+            input_text=input_text, target_language_code=target_language_code
+        )
+    )
+    return _parse_text_to_speech_response(
+        response=response, input_text=input_text
+    )
+
+
+def _get_text_to_text_request(
     input_text: str,
     source_language_code: str,
     target_language_code: str,
-) -> Optional[str]:
-    """Translates text to target language text."""
+) -> dict[str, Any]:
+    """Gets arguments of the request to translate text."""
     payload = {
         "input": input_text,
         "source_language_code": source_language_code,
         "target_language_code": target_language_code,
         "speaker_gender": "Female",
-        "mode": "code-mixed",
-        "model": "mayura:v1",
+        "mode": voice_assistant_constants.TRANSLATION_MODE,
+        "model": voice_assistant_constants.TRANSLATION_MODEL,
         "enable_preprocessing": False,
     }
-
-    headers = {
-        "API-Subscription-Key": voice_assistant_constants.SARVAM_API_KEY
+    return {
+        "base_url": voice_assistant_constants.SARVAM_BASE_URL,
+        "method": "POST",
+        "endpoint": "translate",
+        "headers": _get_headers(),
+        "payload": payload,
+        "retry_policy": _RETRY_POLICY,
     }
 
-    response = api_utils.make_request(
-        base_url=voice_assistant_constants.SARVAM_BASE_URL,
-        method="POST",
-        endpoint="translate",
-        headers=headers,
-        payload=payload,
-    )
 
+def _parse_text_to_text_response(
+    response: Optional[dict], input_text: str
+) -> Optional[str]:
+    """Gets the translated text from the response of translate API."""
     if response and "translated_text" in response:
         return response["translated_text"]
     logging.error(f"Unable to translate text for input {input_text}.")
     return None
 
 
-def speech_to_text_translate(
-    audio_data: bytes,
-) -> Optional[tuple[str, str]]:
-    """Translates speech from any reginal language to english text."""
-    # Wrap the raw audio bytes in a BytesIO buffer to structure it as a WAV file
+def text_to_text(
+    input_text: str,
+    source_language_code: str,
+    target_language_code: str,
+) -> Optional[str]:
+    """Translates text to target language text."""
+    response = api_utils.make_request(
+        **_get_text_to_text_request(
+            input_text=input_text,
+            source_language_code=source_language_code,
+            target_language_code=target_language_code,
+        )
+    )
+    return _parse_text_to_text_response(
+        response=response, input_text=input_text
+    )
+
+
+async def async_text_to_text(
+    input_text: str,
+    source_language_code: str,
+    target_language_code: str,
+) -> Optional[str]:
+    """Translates text to target language text from event loop."""
+    response = await api_utils.async_make_request(
+        **_get_text_to_text_request(
+            input_text=input_text,
+            source_language_code=source_language_code,
+            target_language_code=target_language_code,
+        )
+    )
+    return _parse_text_to_text_response(
+        response=response, input_text=input_text
+    )
+
+
+def _get_speech_to_text_translate_request(
+    audio_data: Union[bytes, memoryview],
+) -> dict[str, Any]:
+    """Gets arguments of the request to translate speech to english text."""
+    # Wrap the raw audio bytes in a BytesIO buffer to structure it as a WAV
+    # file. Audio views are written as is without joining them first.
     audio_buffer = io.BytesIO()
     with wave.open(audio_buffer, "wb") as wf:
         wf.setnchannels(voice_assistant_constants.CHANNELS)
@@ -119,34 +203,52 @@ def speech_to_text_translate(
     # Move the buffer's pointer to the beginning for reading
     audio_buffer.seek(0)
 
-    files = {"file": ("audio.wav", audio_buffer, "audio/wav")}
-
-    headers = {
-        "API-Subscription-Key": voice_assistant_constants.SARVAM_API_KEY
+    return {
+        "base_url": voice_assistant_constants.SARVAM_BASE_URL,
+        "method": "POST",
+        "endpoint": "speech-to-text-translate",
+        "headers": _get_headers(),
+        "files": {"file": ("audio.wav", audio_buffer, "audio/wav")},
+        "retry_policy": _RETRY_POLICY,
     }
 
-    response = api_utils.make_request(
-        base_url=voice_assistant_constants.SARVAM_BASE_URL,
-        method="POST",
-        endpoint="speech-to-text-translate",
-        headers=headers,
-        files=files,
-    )
 
+def _parse_speech_to_text_translate_response(
+    response: Optional[dict],
+) -> Optional[tuple[str, str]]:
+    """Gets transcript and language from speech to text translate API."""
     if response and "transcript" in response and "language_code" in response:
         return response["transcript"], response["language_code"]
     return None
 
 
-def speech_to_speech(
-    raw_audio_bytes: bytes,
-    conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
-) -> Optional[tuple[bytes, bool]]:
-    """Generates ai speech response for user speech."""
-    # Transcribe input audio to english text.
-    response = speech_to_text_translate(audio_data=raw_audio_bytes)
+def speech_to_text_translate(
+    audio_data: Union[bytes, memoryview],
+) -> Optional[tuple[str, str]]:
+    """Translates speech from any reginal language to english text."""
+    response = api_utils.make_request(
+        **_get_speech_to_text_translate_request(audio_data=audio_data)
+    )
+    return _parse_speech_to_text_translate_response(response=response)
+
+
+async def async_speech_to_text_translate(
+    audio_data: Union[bytes, memoryview],
+) -> Optional[tuple[str, str]]:
+    """Translates speech to english text from event loop."""
+    response = await api_utils.async_make_request(
+        **_get_speech_to_text_translate_request(audio_data=audio_data)
+    )
+    return _parse_speech_to_text_translate_response(response=response)
+
+
+async def transcribe_speech(
+    raw_audio_bytes: Union[bytes, memoryview],
+) -> Optional[tuple[str, str]]:
+    """Transcribes user speech to english text and detects its language."""
+    response = await async_speech_to_text_translate(audio_data=raw_audio_bytes)
     if not response:
-        return response
+        return None
     transcript, language_code = response
 
     # Using default language when speaker's language cannot be determined.
@@ -156,16 +258,35 @@ def speech_to_speech(
     if not transcript:
         logging.error("Empty transcript found.")
         return None
+    return transcript, language_code
+
+
+async def speech_to_text_response(
+    raw_audio_bytes: Union[bytes, memoryview],
+    conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
+) -> Optional[tuple[str, str, str]]:
+    """Generates ai text response in speaker's language for user speech.
+
+    Returns:
+        Ai response in english, its translation and language of translation.
+    """
+    response = await transcribe_speech(raw_audio_bytes=raw_audio_bytes)
+    if not response:
+        return None
+    transcript, language_code = response
 
     # Generate AI response for given human input.
     conversation_flow_handler.add_human_message(text=transcript)
-    ai_message = conversation_flow_handler.generate_response()
+    ai_message = await speech_executor.run_in_executor(
+        conversation_flow_handler.generate_response
+    )
     if not ai_message:
         return None
 
     # Translate ai response to speaker's language if not english.
+    translated_text = ai_message
     if language_code != "en-IN":
-        translated_text = text_to_text(
+        translated_text = await async_text_to_text(
             input_text=ai_message,
             source_language_code="en-IN",
             target_language_code=language_code,
@@ -175,10 +296,142 @@ def speech_to_speech(
             translated_text = ai_message
             language_code = "en-IN"
 
+    return ai_message, translated_text, language_code
+
+
+async def speech_to_speech(
+    raw_audio_bytes: Union[bytes, memoryview],
+    conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
+) -> Optional[tuple[str, bytes]]:
+    """Generates ai speech response for user speech.
+
+    Returns:
+        Ai response in english and its speech in speaker's language.
+    """
+    response = await speech_to_text_response(
+        raw_audio_bytes=raw_audio_bytes,
+        conversation_flow_handler=conversation_flow_handler,
+    )
+    if not response:
+        return None
+    ai_message, translated_text, language_code = response
+
     # Transcribe ai response to speech in target language
-    output_audio = text_to_speech(
+    output_audio = await async_text_to_speech(
         input_text=translated_text,
         target_language_code=language_code,
     )
+    if not output_audio:
+        return None
+
+    return ai_message, output_audio
+
+
+async def sentence_to_speech(
+    sentence: str, source_language_code: str, target_language_code: str
+) -> Optional[bytes]:
+    """Translates a sentence to target language and converts it to speech."""
+    if source_language_code != target_language_code:
+        translated_text = await async_text_to_text(
+            input_text=sentence,
+            source_language_code=source_language_code,
+            target_language_code=target_language_code,
+        )
+        if not translated_text:
+            # Defaults to source language when failed to translate.
+            translated_text = sentence
+            target_language_code = source_language_code
+        sentence = translated_text
+
+    return await async_text_to_speech(
+        input_text=sentence,
+        target_language_code=target_language_code,
+    )
+
+
+async def sentences_to_speech_stream(
+    sentences: AsyncIterable[str],
+    source_language_code: str,
+    target_language_code: str,
+) -> AsyncIterator[tuple[str, bytes]]:
+    """Yields each sentence with its speech as soon as speech is ready.
+
+    Sentences are translated and synthesised concurrently as they arrive but
+    speech is yielded in the order of sentences.
+    """
+    speech_tasks: asyncio.Queue[Optional[tuple[str, asyncio.Future]]] = (
+        asyncio.Queue()
+    )
+    pending_tasks = []
 
-    return output_audio
+    async def schedule_sentences():
+        """Starts speech synthesis for every sentence received."""
+        try:
+            async for sentence in sentences:
+                task = asyncio.ensure_future(
+                    sentence_to_speech(
+                        sentence=sentence,
+                        source_language_code=source_language_code,
+                        target_language_code=target_language_code,
+                    )
+                )
+                pending_tasks.append(task)
+                speech_tasks.put_nowait((sentence, task))
+        finally:
+            speech_tasks.put_nowait(None)
+
+    scheduler_task = asyncio.ensure_future(schedule_sentences())
+    try:
+        while (speech_task := await speech_tasks.get()) is not None:
+            sentence, task = speech_task
+            audio = await task
+            if audio:
+                yield sentence, audio
+        await scheduler_task  # Raise errors received while scheduling.
+    finally:
+        # Stop synthesising remaining sentences if nobody listens to them.
+        scheduler_task.cancel()
+        for task in pending_tasks:
+            task.cancel()
+
+
+async def text_to_speech_stream(
+    input_text: str, target_language_code: str
+) -> AsyncIterator[bytes]:
+    """Yields speech for each sentence of text as soon as it is ready."""
+
+    async def iterate_sentences():
+        for sentence in text_utils.split_into_sentences(text=input_text):
+            yield sentence
+
+    async for _, audio in sentences_to_speech_stream(
+        sentences=iterate_sentences(),
+        source_language_code=target_language_code,
+        target_language_code=target_language_code,
+    ):
+        yield audio
+
+
+async def speech_to_speech_stream(
+    raw_audio_bytes: Union[bytes, memoryview],
+    conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
+) -> AsyncIterator[tuple[str, bytes]]:
+    """Yields ai response sentence by sentence with speech for user speech.
+
+    Translation and speech synthesis of completed sentences overlap with
+    generation of the remaining response.
+    """
+    response = await transcribe_speech(raw_audio_bytes=raw_audio_bytes)
+    if not response:
+        return
+    transcript, language_code = response
+
+    # Generate AI response for given human input and speak it in speaker's
+    # language.
+    conversation_flow_handler.add_human_message(text=transcript)
+    async for sentence, audio in sentences_to_speech_stream(
+        sentences=conversation_flow_handler.generate_response_stream(),
+        source_language_code="en-IN",
+        target_language_code=language_code,
+    ):
+        yield sentence, audio
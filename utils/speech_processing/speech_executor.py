@@ -0,0 +1,23 @@
+"""Bounded thread pool to run blocking speech processing calls."""
+
+import asyncio
+import concurrent.futures
+import functools
+from typing import Any, Callable
+
+from constants import voice_assistant_constants
+
+# Bounded pool shared by all calls to run blocking speech processing requests
+# without stalling the event loop.
+speech_processing_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=voice_assistant_constants.SPEECH_PROCESSING_MAX_WORKERS,
+    thread_name_prefix="speech-processing",
+)
+
+
+async def run_in_executor(func: Callable, **kwargs) -> Any:
+    """Runs a blocking function in speech processing thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        speech_processing_executor, functools.partial(func, **kwargs)
+    )
@@ -4,6 +4,9 @@ import enum
 
 import webrtcvad
 
+# Frame durations supported by webrtc-vad.
+SUPPORTED_FRAME_DURATIONS_MS = (10, 20, 30)
+
 
 class SpeakerState(enum.Enum):
     """State of speaker."""
@@ -14,52 +17,93 @@ class SpeakerState(enum.Enum):
 
 
 class VoiceActivityDetection:
-    """Voice activity detection such as speaking or idle."""
+    """Voice activity detection such as speaking or idle for a single call.
+
+    Incoming audio chunks are split into VAD frames and every complete frame
+    is evaluated. Partial frames are carried over to the next chunk so that
+    no audio is padded or skipped. Short pauses within the hangover time are
+    still treated as speech.
+    """
 
     def __init__(
         self,
         rate: int,
         vad_frames_per_buffer: int,
         bytes_per_sample: int,
-        idle_time_trigger_sec: int,
-        chunk: int,
+        idle_time_trigger_sec: float,
         vad_mode: int = 3,
+        hangover_time_sec: float = 0.0,
     ) -> None:
         """Initialise the state of VAD instance."""
+        frame_duration_ms = vad_frames_per_buffer * 1000 / rate
+        if frame_duration_ms not in SUPPORTED_FRAME_DURATIONS_MS:
+            raise ValueError(
+                f"VAD frame of {frame_duration_ms} ms is not supported, use "
+                f"one of {SUPPORTED_FRAME_DURATIONS_MS} ms."
+            )
         self.sample_rate = rate
         self.frame_size = vad_frames_per_buffer
         self.bytes_per_sample = bytes_per_sample
-        self.idle_cut = int(idle_time_trigger_sec / (chunk / rate))
-        self.last_voice_activity = {}
+        self.frame_bytes = vad_frames_per_buffer * bytes_per_sample
+        self.idle_cut = max(
+            1, int(idle_time_trigger_sec * 1000 / frame_duration_ms)
+        )
+        self.hangover_frames = int(
+            hangover_time_sec * 1000 / frame_duration_ms
+        )
         self.vad = webrtcvad.Vad(mode=vad_mode)
 
-    def detect_activity(self, audio_frame, client_id) -> SpeakerState:
+        self._pending_audio = bytearray()
+        self._idle_frames = 0
+        self._hangover_frames_left = 0
+        self._has_spoken = False
+        self._is_speaking = False
+        # Whether the last chunk had a voiced frame, excluding hangover.
+        self.is_voiced = False
+
+    def detect_activity(self, audio_frame: bytes) -> SpeakerState:
         """Detects if speaker is speaking or idle for a while."""
-        last_30_ms = audio_frame[-self.frame_size * self.bytes_per_sample :]
-        idle_time = self._manage_client_idle(client_id)
-        converted_frame = self._convert_buffer_size(last_30_ms)
-        is_speech = self.vad.is_speech(
-            converted_frame, sample_rate=self.sample_rate
-        )
-        if is_speech:
-            self.last_voice_activity[client_id] = 0
-            return SpeakerState.SPEAKING
-        else:
-            if idle_time == self.idle_cut:
-                self.last_voice_activity[client_id] = 0
-                return SpeakerState.IDLE_FOR_A_WHILE
+        self._pending_audio += audio_frame
+        num_frames = len(self._pending_audio) // self.frame_bytes
+
+        # Chunks without a complete frame keep the state of the last frame.
+        is_speaking = self._is_speaking if num_frames == 0 else False
+        is_idle_for_a_while = False
+        self.is_voiced = False
+        for index in range(num_frames):
+            frame = self._pending_audio[
+                index * self.frame_bytes : (index + 1) * self.frame_bytes
+            ]
+            if self.vad.is_speech(frame, sample_rate=self.sample_rate):
+                is_speaking = True
+                self.is_voiced = True
+                self._has_spoken = True
+                self._idle_frames = 0
+                self._hangover_frames_left = self.hangover_frames
+            elif self._hangover_frames_left > 0:
+                # Smooth over short pauses within speech.
+                is_speaking = True
+                self._hangover_frames_left -= 1
             else:
-                self.last_voice_activity[client_id] += 1
-                return SpeakerState.NOT_SPEAKING
+                self._idle_frames += 1
+                if self._has_spoken and self._idle_frames >= self.idle_cut:
+                    # Trigger only once per pause after speech.
+                    is_idle_for_a_while = True
+                    self._has_spoken = False
+            self._is_speaking = self._idle_frames == 0
+        del self._pending_audio[: num_frames * self.frame_bytes]
 
-    def _convert_buffer_size(self, audio_frame: bytes) -> bytes:
-        """Pads audio chunk to max length."""
-        while len(audio_frame) < (self.frame_size * self.bytes_per_sample):
-            audio_frame = audio_frame + b"\x00"
-        return audio_frame
+        if is_speaking:
+            return SpeakerState.SPEAKING
+        if is_idle_for_a_while:
+            return SpeakerState.IDLE_FOR_A_WHILE
+        return SpeakerState.NOT_SPEAKING
 
-    def _manage_client_idle(self, client_id: str) -> int:
-        """Manages the state of being idle for given client."""
-        if client_id not in self.last_voice_activity:
-            self.last_voice_activity[client_id] = 0
-        return self.last_voice_activity[client_id]
+    def reset(self):
+        """Forgets the audio and speech seen so far."""
+        self._pending_audio.clear()
+        self._idle_frames = 0
+        self._hangover_frames_left = 0
+        self._has_spoken = False
+        self._is_speaking = False
+        self.is_voiced = False
@@ -2,7 +2,7 @@
 
 import logging
 import time
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import vertexai
 from vertexai import generative_models
@@ -51,3 +51,27 @@ class Gemini:
         duration = (time.time() - start_time) * 1000  # ms
         logging.info(f"Generated llm response in {duration:.2f} ms.")
         return responses.text.strip()
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yields text of the generation for prompt as it is generated."""
+        start_time = time.time()  # Start timing the request
+        responses = await self.model.generate_content_async(
+            [prompt],
+            generation_config=self.generation_config,
+            stream=True,
+        )
+        is_first_chunk = True
+        async for response in responses:
+            if is_first_chunk:
+                duration = (time.time() - start_time) * 1000  # ms
+                logging.info(f"Received first llm chunk in {duration:.2f} ms.")
+                is_first_chunk = False
+            try:
+                text = response.text
+            except ValueError:
+                # Chunks without text such as the final safety ratings.
+                continue
+            if text:
+                yield text
+        duration = (time.time() - start_time) * 1000  # ms
+        logging.info(f"Streamed llm response in {duration:.2f} ms.")
@@ -0,0 +1,31 @@
+"""Helper library for processing text."""
+
+import re
+from typing import AsyncIterable, AsyncIterator
+
+# Sentence ends with a full stop, question mark, exclamation mark or a
+# devanagari danda followed by whitespace.
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।])\s+")
+
+
+def split_into_sentences(text: str) -> list[str]:
+    """Splits text into sentences."""
+    sentences = SENTENCE_BOUNDARY.split(text.strip())
+    return [sentence for sentence in sentences if sentence.strip()]
+
+
+async def stream_sentences(
+    text_stream: AsyncIterable[str],
+) -> AsyncIterator[str]:
+    """Yields complete sentences from a stream of text chunks."""
+    pending_text = ""
+    async for text_chunk in text_stream:
+        pending_text += text_chunk
+        sentences = SENTENCE_BOUNDARY.split(pending_text)
+        # Last part can be an incomplete sentence.
+        pending_text = sentences.pop()
+        for sentence in sentences:
+            if sentence.strip():
+                yield sentence.strip()
+    if pending_text.strip():
+        yield pending_text.strip()
@@ -0,0 +1,121 @@
+"""Submodule to hold the state of an ongoing phone call."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from constants import voice_assistant_constants
+from utils.speech_processing import (
+    audio_buffer,
+    noise_reduction,
+    voice_activity_detection,
+)
+from voice_assistant_modules import turn_scheduler
+
+
+class CallSession:
+    """State of a single phone call identified by twilio stream sid."""
+
+    __slots__ = (
+        "stream_sid",
+        "phone_number",
+        "audio_buffer",
+        "denoiser",
+        "vad_detector",
+        "turn_scheduler",
+        "ai_turn_task",
+        "barge_in_speech_sec",
+        "is_conversation_ended",
+    )
+
+    def __init__(self, stream_sid: str, phone_number: str) -> None:
+        """Initialise the state of a new call."""
+        self.stream_sid = stream_sid
+        self.phone_number = phone_number
+        max_utterance_bytes = (
+            voice_assistant_constants.MAX_UTTERANCE_SEC
+            * voice_assistant_constants.RATE
+            * voice_assistant_constants.BYTES_PER_SAMPLE
+        )
+        self.audio_buffer = audio_buffer.PcmRingBuffer(
+            max_bytes=max_utterance_bytes
+        )
+        self.denoiser = noise_reduction.StreamingDenoiser()
+        self.vad_detector = voice_activity_detection.VoiceActivityDetection(
+            rate=voice_assistant_constants.RATE,
+            vad_frames_per_buffer=voice_assistant_constants.VAD_FRAMES_PER_BUFFER,
+            bytes_per_sample=voice_assistant_constants.BYTES_PER_SAMPLE,
+            idle_time_trigger_sec=voice_assistant_constants.IDLE_TIME_TRIGGER_SEC,
+            vad_mode=voice_assistant_constants.VAD_MODE,
+            hangover_time_sec=voice_assistant_constants.VAD_HANGOVER_SEC,
+        )
+        self.turn_scheduler = turn_scheduler.TurnScheduler()
+        self.ai_turn_task: Optional[asyncio.Task] = None
+        # Duration of caller speech heard while AI is responding.
+        self.barge_in_speech_sec = 0.0
+        self.is_conversation_ended = False
+
+    def buffer_caller_audio(self, raw_audio_bytes: bytes):
+        """Buffers an audio chunk spoken by the caller."""
+        self.audio_buffer.write(audio_frame=raw_audio_bytes)
+
+    def pop_caller_audio(self) -> bytes:
+        """Returns a copy of audio spoken by caller so far.
+
+        The audio is copied since it may still be read by work of a
+        cancelled AI turn after the buffer is reused. Voice activity seen so
+        far is forgotten, as it ends the caller turn.
+        """
+        raw_audio_bytes = bytes(self.audio_buffer.read())
+        self.audio_buffer.reset()
+        self.vad_detector.reset()
+        return raw_audio_bytes
+
+    def discard_caller_audio(self):
+        """Drops audio buffered since the last pop."""
+        self.audio_buffer.reset()
+        self.barge_in_speech_sec = 0.0
+
+    def cancel_ai_turn(self):
+        """Cancels the task of the AI response, if any.
+
+        Speech and translation requests in flight are cancelled. LLM calls
+        already running in worker threads are not stopped, but their results
+        are dropped.
+        """
+        if self.ai_turn_task is not None and not self.ai_turn_task.done():
+            self.ai_turn_task.cancel()
+
+    def close(self):
+        """Releases the state held by the call."""
+        self.is_conversation_ended = True
+        self.cancel_ai_turn()
+        self.audio_buffer.reset()
+        self.turn_scheduler.close()
+
+
+# Mapping from twilio stream sid to ongoing calls.
+active_call_sessions: dict[str, CallSession] = {}
+
+
+def open_call_session(stream_sid: str, phone_number: str) -> CallSession:
+    """Creates and registers the session for a new call."""
+    session = CallSession(stream_sid=stream_sid, phone_number=phone_number)
+    active_call_sessions[stream_sid] = session
+    logging.info(
+        f"Opened call session {stream_sid}, "
+        f"{len(active_call_sessions)} active call(s)."
+    )
+    return session
+
+
+def close_call_session(stream_sid: str):
+    """Tears down the session of a finished call."""
+    session = active_call_sessions.pop(stream_sid, None)
+    if session is None:
+        return
+    session.close()
+    logging.info(
+        f"Closed call session {stream_sid}, "
+        f"{len(active_call_sessions)} active call(s)."
+    )
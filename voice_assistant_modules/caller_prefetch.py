@@ -0,0 +1,91 @@
+"""Submodule to prefetch caller data before the media stream is connected."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from constants import voice_assistant_constants
+from utils import data_utils, onboarding_utils
+
+UserJourneyStage = onboarding_utils.UserJourneyStage
+
+
+class CallerData:
+    """Data of a caller needed to start the conversation."""
+
+    def __init__(
+        self,
+        document_context: onboarding_utils.UserDocumentContext,
+        user_journey_state: UserJourneyStage,
+        questionnaire: Optional[list[dict]] = None,
+    ) -> None:
+        """Initialise the data of a caller."""
+        self.document_context = document_context
+        self.user_journey_state = user_journey_state
+        self.questionnaire = questionnaire
+
+
+def load_caller_data(phone_number: str) -> CallerData:
+    """Loads user doc, journey state and questionnaire of a caller."""
+    document_context = onboarding_utils.load_user_document_context(
+        phone_number=phone_number
+    )
+    user_journey_state = onboarding_utils.detect_user_journey_state(
+        phone_number=phone_number, document_context=document_context
+    )
+    questionnaire = None
+    if user_journey_state == UserJourneyStage.CUSTOMER_PROFILE_PENDING:
+        questionnaire = data_utils.load_json_from_disk(
+            filepath=voice_assistant_constants.ADVISOR_QUESTIONNAIRE_PATH
+        )
+    return CallerData(
+        document_context=document_context,
+        user_journey_state=user_journey_state,
+        questionnaire=questionnaire,
+    )
+
+
+# Running or finished prefetch tasks by phone number.
+prefetch_tasks: dict[str, asyncio.Task] = {}
+
+
+def _drop_prefetch_task(phone_number: str, task: asyncio.Task):
+    """Forgets a prefetch task which was never used by a media stream."""
+    if prefetch_tasks.get(phone_number) is not task:
+        return
+    del prefetch_tasks[phone_number]
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled() and task.exception():
+        logging.error(
+            f"Failed to prefetch data of {phone_number}: {task.exception()}"
+        )
+    logging.info(f"Dropped unused prefetched data of {phone_number}.")
+
+
+def start_prefetch(phone_number: str):
+    """Starts loading caller data in background while the call connects."""
+    if phone_number in prefetch_tasks:
+        return
+    task = asyncio.create_task(
+        asyncio.to_thread(load_caller_data, phone_number=phone_number)
+    )
+    prefetch_tasks[phone_number] = task
+    # Drop the data if media stream is never connected.
+    asyncio.get_running_loop().call_later(
+        voice_assistant_constants.CALLER_PREFETCH_TTL_SEC,
+        _drop_prefetch_task,
+        phone_number,
+        task,
+    )
+
+
+async def get_caller_data(phone_number: str) -> CallerData:
+    """Gets prefetched caller data, or loads it if not prefetched."""
+    task = prefetch_tasks.pop(phone_number, None)
+    if task is not None:
+        try:
+            return await task
+        except Exception as e:
+            logging.error(f"Failed to prefetch data of {phone_number}: {e}")
+    return await asyncio.to_thread(load_caller_data, phone_number=phone_number)
@@ -1,11 +1,11 @@
 """Submodule to handle conversation around advisor's notes with human."""
 
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from langchain_core import prompts
 
 from constants.prompts import ria_advice_explanation_prompt
-from utils.text_processing import llm_utils
+from utils.text_processing import llm_utils, text_utils
 from voice_assistant_modules.conversation_flows import base_conversation_flow
 
 
@@ -19,6 +19,7 @@ class AdviceExplanationConversation(
         customer_profile_and_advice: Optional[str] = "",
     ):
         """Initiate RIA's advice explanation conversation flow."""
+        super().__init__()
         self.prompt = prompts.ChatPromptTemplate.from_messages(
             [
                 (
@@ -35,14 +36,8 @@ class AdviceExplanationConversation(
 
     def generate_response(self) -> Optional[str]:
         """Generates the ai response based on current chat history."""
-        # Add values for placeholders in the  prompt template.
-        prompt_text = self.prompt.format(
-            chat_history=self.chat_history,
-            customer_profile_and_advice=self.customer_profile_and_advice,
-        )
-
         # Generate model response
-        ai_response = self.model.generate(prompt=prompt_text)
+        ai_response = self.model.generate(prompt=self._build_prompt())
         if not ai_response:
             ai_response = (
                 "Sorry, I totally missed that. Can you please repeat?"
@@ -51,9 +46,32 @@ class AdviceExplanationConversation(
         if ai_response.lower().startswith("ai:"):
             ai_response = ai_response[3:]
 
-        self.add_ai_message(ai_response)  # Add ai message in chat history
         return ai_response
 
+    async def generate_response_stream(self) -> AsyncIterator[str]:
+        """Yields sentences of the ai response while model generates it."""
+        is_sentence_yielded = False
+        async for sentence in text_utils.stream_sentences(
+            text_stream=self.model.generate_stream(prompt=self._build_prompt())
+        ):
+            if not is_sentence_yielded and sentence.lower().startswith("ai:"):
+                sentence = sentence[3:].strip()
+            if not sentence:
+                continue
+            is_sentence_yielded = True
+            yield sentence
+
+        if not is_sentence_yielded:
+            yield "Sorry, I totally missed that. Can you please repeat?"
+
     def is_conversation_ended(self) -> bool:
         """Ends the conversation if user do not have any more questions."""
         return self.conversation_ended
+
+    def _build_prompt(self) -> str:
+        """Adds values for placeholders in the prompt template."""
+        with self._lock:
+            return self.prompt.format(
+                chat_history=self.chat_history,
+                customer_profile_and_advice=self.customer_profile_and_advice,
+            )
@@ -1,6 +1,7 @@
 """Submodule to handle conversation around advisor questionnaire with human."""
 
 import ast
+import logging
 import re
 from typing import Any, Optional
 
@@ -24,6 +25,7 @@ class AdvisorQuestionnaireConversation(
         self, questionnaire: list[dict], aa_summary: Optional[str] = ""
     ):
         """Initiate advisor questionnaire conversation flow."""
+        super().__init__()
         self.ai_response_key = "next_ai_response_for_human"
         self.prompt = prompts.ChatPromptTemplate.from_messages(
             [
@@ -48,11 +50,13 @@ class AdvisorQuestionnaireConversation(
     def generate_response(self) -> Optional[str]:
         """Generates the ai response based on current chat history."""
         # Add values for placeholders in the  prompt template.
-        prompt_text = self.prompt.format(
-            chat_history=self.chat_history,
-            questions=self._build_question_md(),
-            aa_summary=self.aa_summary,
-        )
+        with self._lock:
+            turn_id = self.turn_id
+            prompt_text = self.prompt.format(
+                chat_history=self.chat_history,
+                questions=self._build_question_md(),
+                aa_summary=self.aa_summary,
+            )
 
         # Generate model response
         structured_response_str = self.model.generate(prompt=prompt_text)
@@ -65,36 +69,37 @@ class AdvisorQuestionnaireConversation(
                 "Sorry, I totally missed that. Can you please repeat?"
             )
 
-        # Update latest answers
-        self.latest_answers = structured_response
+        # Update latest answers, unless the human has spoken again since.
+        with self._lock:
+            if turn_id != self.turn_id:
+                logging.info(f"Dropped answers of stale turn {turn_id}.")
+                return None
+            self.latest_answers = structured_response
+
+            # End the conversation if all the answers has been provided.
+            if self.is_conversation_ended():
+                ai_response = (
+                    "Thanks for your help. I think we have got all the "
+                    "answers required at the moment. Our registered "
+                    "investment advisor will soon provide the advise. Have "
+                    "a nice day. "
+                )
 
-        # End the conversation if all the answers has been provided.
-        if self.is_conversation_ended():
-            ai_response = (
-                "Thanks for your help. I think we have got all the answers "
-                "required at the moment. Our registered investment advisor "
-                "will soon provide the advise. Have a nice day. "
-            )
-
-        self.add_ai_message(ai_response)  # Add ai message in chat history
         return ai_response
 
-    def save_answer_to_doc(self, doc_id: str, docs_service: Any, creds: Any):
+    def save_answer_to_doc(self, doc_id: str, docs_service: Any):
         """Writes answers collected from the conversation to google doc."""
-        creds, docs_service, drive_service = (
-            google_docs_utils.get_google_doc_creds()
+        doc_builder = google_docs_utils.GoogleDocBuilder(
+            doc_id=doc_id, docs_service=docs_service
         )
+
         # Add a heading and description for customer profile
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=doc_id,
-            docs_service=docs_service,
+        doc_builder.add_heading(
             heading=customer_profile_doc.CUSTOMER_PROFILE_HEADING,
             heading_level=1,
         )
-        google_docs_utils.write_title_to_google_doc(
-            doc_id=doc_id,
-            docs_service=docs_service,
-            title=customer_profile_doc.CUSTOMER_PROFILE_DESCRIPTION,
+        doc_builder.add_title(
+            title=customer_profile_doc.CUSTOMER_PROFILE_DESCRIPTION
         )
 
         # Add answers table
@@ -103,25 +108,17 @@ class AdvisorQuestionnaireConversation(
             answer = self.latest_answers.get(question["index"], "")
             question_answer_list.append([question["question"], answer])
 
-        google_docs_utils.write_table_to_google_doc(
-            table_data=question_answer_list,
-            doc_id=doc_id,
-            docs_service=docs_service,
-            creds=creds,
-        )
+        doc_builder.add_table(table_data=question_answer_list)
 
         # Add a heading and description for financial advisor blank section
-        google_docs_utils.write_heading_to_google_doc(
-            doc_id=doc_id,
-            docs_service=docs_service,
+        doc_builder.add_heading(
             heading=customer_profile_doc.FINANCIAL_ADVISE_HEADING,
             heading_level=1,
         )
-        google_docs_utils.write_title_to_google_doc(
-            doc_id=doc_id,
-            docs_service=docs_service,
-            title=customer_profile_doc.FINANCIAL_ADVISE_DESCRIPTION,
+        doc_builder.add_title(
+            title=customer_profile_doc.FINANCIAL_ADVISE_DESCRIPTION
         )
+        doc_builder.flush()
 
     def is_conversation_ended(self) -> bool:
         """Ends the conversation if all questions are answered."""
@@ -1,25 +1,67 @@
 """Base class for human and ai conversation flows."""
 
+import threading
+from typing import AsyncIterator, Optional
+
 from langchain_core import messages
 
+from utils.speech_processing import speech_executor
+from utils.text_processing import text_utils
+
 
 class BaseConversationFlow:
     """Base conversation flow."""
 
-    chat_history: list[messages.BaseMessage] = []
+    def __init__(self) -> None:
+        """Initialise an empty chat history for the conversation."""
+        self.chat_history: list[messages.BaseMessage] = []
+        # Incremented for every human message, so that generation started in
+        # an earlier turn can tell that it is stale.
+        self.turn_id = 0
+        # Guards the state of the flow, which is read by worker threads.
+        self._lock = threading.Lock()
 
     def add_human_message(self, text: str):
-        """Appends a human message to chat history."""
-        self.chat_history.append(messages.HumanMessage(content=text))
+        """Appends a human message to chat history and starts a new turn.
+
+        Human speech whose response was never played is merged with the new
+        message, so that the chat history keeps alternating speakers.
+        """
+        with self._lock:
+            self.turn_id += 1
+            if self.chat_history and isinstance(
+                self.chat_history[-1], messages.HumanMessage
+            ):
+                text = f"{self.chat_history.pop().content} {text}"
+            self.chat_history.append(messages.HumanMessage(content=text))
 
     def add_ai_message(self, text: str):
         """Appends an AI message to chat history."""
-        self.chat_history.append(messages.AIMessage(content=text))
+        with self._lock:
+            self.chat_history.append(messages.AIMessage(content=text))
 
-    def generate_response(self) -> str:
-        """Generates next ai response based on chat history."""
+    def generate_response(self) -> Optional[str]:
+        """Generates next ai response based on chat history.
+
+        It runs in a worker thread which keeps running when the turn is
+        cancelled, so it does not add the response to chat history. Callers
+        add the part of the response which was played with `add_ai_message`.
+        """
         raise NotImplementedError
 
+    async def generate_response_stream(self) -> AsyncIterator[str]:
+        """Yields sentences of next ai response as they are generated.
+
+        Flows which can not stream generate the whole response first.
+        """
+        ai_response = await speech_executor.run_in_executor(
+            self.generate_response
+        )
+        for sentence in text_utils.split_into_sentences(
+            text=ai_response or ""
+        ):
+            yield sentence
+
     def is_conversation_ended(self) -> bool:
         """Checks if conversation is already ended."""
         raise NotImplementedError
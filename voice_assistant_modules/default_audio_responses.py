@@ -1,65 +1,182 @@
 """Submodule to handle default scenarios."""
 
-import functools
+import asyncio
 import logging
-from typing import Optional
+from typing import Iterable, Optional
 
 import fastapi
 
-from utils.speech_processing import audio_streaming_utils, sarvam_ai_utils
+from constants import voice_assistant_constants
+from utils.speech_processing import (
+    audio_cache,
+    audio_streaming_utils,
+    sarvam_ai_utils,
+    speech_executor,
+)
 
 
-@functools.lru_cache(maxsize=10)
 def cached_text_to_text(
     input_text: str, target_language_code: str
 ) -> Optional[str]:
-    """Caches audio responses for given input_text."""
-    return sarvam_ai_utils.text_to_text(
+    """Translates english text using the on disk cache."""
+    translated_text = audio_cache.load_translation(
         input_text=input_text,
         source_language_code="en-IN",
         target_language_code=target_language_code,
     )
+    if translated_text is not None:
+        return translated_text
+
+    translated_text = sarvam_ai_utils.text_to_text(
+        input_text=input_text,
+        source_language_code="en-IN",
+        target_language_code=target_language_code,
+    )
+    if translated_text:
+        audio_cache.save_translation(
+            input_text=input_text,
+            source_language_code="en-IN",
+            target_language_code=target_language_code,
+            translated_text=translated_text,
+        )
+    return translated_text
 
 
-@functools.lru_cache(maxsize=10)
-def cached_text_to_speech(input_text: str, target_language_code: str):
-    """Caches audio responses for given input_text."""
-    return sarvam_ai_utils.text_to_speech(
+def cached_text_to_speech(
+    input_text: str, target_language_code: str
+) -> Optional[bytes]:
+    """Converts text to speech using the on disk cache."""
+    audio = audio_cache.load_speech(
+        input_text=input_text, target_language_code=target_language_code
+    )
+    if audio is not None:
+        return audio
+
+    audio = sarvam_ai_utils.text_to_speech(
         input_text=input_text,
         target_language_code=target_language_code,
     )
+    if audio:
+        audio_cache.save_speech(
+            input_text=input_text,
+            target_language_code=target_language_code,
+            audio=audio,
+        )
+    return audio
 
 
-async def send_text_as_audio(
-    input_text: str,
-    websocket: fastapi.WebSocket,
-    stream_sid: str,
-    target_language_code: str = "en-IN",
-):
-    """Sends a text as audio message."""
+def cached_text_to_ulaw(
+    input_text: str, target_language_code: str
+) -> Optional[bytes]:
+    """Converts text to µ-law speech using the on disk cache."""
+    ulaw_audio = audio_cache.load_speech(
+        input_text=input_text,
+        target_language_code=target_language_code,
+        audio_format="ulaw",
+    )
+    if ulaw_audio is not None:
+        return ulaw_audio
+
+    audio = cached_text_to_speech(
+        input_text=input_text, target_language_code=target_language_code
+    )
+    if not audio:
+        return None
+    ulaw_audio = audio_streaming_utils.encode_ulaw(raw_audio_bytes=audio)
+    audio_cache.save_speech(
+        input_text=input_text,
+        target_language_code=target_language_code,
+        audio=ulaw_audio,
+        audio_format="ulaw",
+    )
+    return ulaw_audio
+
+
+# Twilio ready media payloads of default responses, by english text and
+# target language.
+ulaw_frame_store: dict[tuple[str, str], list[str]] = {}
+
+
+def render_text_as_ulaw_frames(
+    input_text: str, target_language_code: str = "en-IN"
+) -> Optional[list[str]]:
+    """Renders english text as µ-law media payloads in target language."""
+    store_key = (input_text, target_language_code)
+    if store_key in ulaw_frame_store:
+        return ulaw_frame_store[store_key]
+
     # Translate default message to speaker's language if not english.
+    spoken_text, spoken_language_code = input_text, target_language_code
     if target_language_code != "en-IN":
         translated_text = cached_text_to_text(
             input_text=input_text,
             target_language_code=target_language_code,
         )
-        if not translated_text:
+        if translated_text:
+            spoken_text = translated_text
+        else:
             # Defaults to english response when failed to translate.
-            translated_text = input_text
-            target_language_code = "en-IN"
-        input_text = translated_text
+            spoken_language_code = "en-IN"
 
     # Convert default text response to speech.
-    audio = cached_text_to_speech(
-        input_text=input_text, target_language_code=target_language_code
+    ulaw_audio = cached_text_to_ulaw(
+        input_text=spoken_text, target_language_code=spoken_language_code
     )
-    if not audio:
+    if not ulaw_audio:
+        return None
+    ulaw_frames = audio_streaming_utils.split_into_ulaw_frames(
+        ulaw_audio_bytes=ulaw_audio
+    )
+    if spoken_language_code == target_language_code:
+        # English fallbacks are not stored so that translation is retried.
+        ulaw_frame_store[store_key] = ulaw_frames
+    return ulaw_frames
+
+
+async def prewarm_default_responses(
+    languages: Iterable[str] = voice_assistant_constants.SUPPORTED_LANGUAGES,
+) -> int:
+    """Renders all default responses in given languages into the cache.
+
+    Returns:
+        Number of responses which are available in the cache.
+    """
+    renders = [
+        speech_executor.run_in_executor(
+            render_text_as_ulaw_frames,
+            input_text=input_text,
+            target_language_code=language,
+        )
+        for language in languages
+        for input_text in voice_assistant_constants.DEFAULT_RESPONSES
+    ]
+    ulaw_frames = await asyncio.gather(*renders, return_exceptions=True)
+    num_cached = sum(isinstance(frames, list) for frames in ulaw_frames)
+    logging.info(f"Cached {num_cached}/{len(ulaw_frames)} default responses.")
+    return num_cached
+
+
+async def send_text_as_audio(
+    input_text: str,
+    websocket: fastapi.WebSocket,
+    stream_sid: str,
+    target_language_code: str = "en-IN",
+):
+    """Sends a text as audio message."""
+    ulaw_frames = ulaw_frame_store.get((input_text, target_language_code))
+    if ulaw_frames is None:
+        ulaw_frames = await speech_executor.run_in_executor(
+            render_text_as_ulaw_frames,
+            input_text=input_text,
+            target_language_code=target_language_code,
+        )
+    if not ulaw_frames:
         logging.error(f"Could not send text={input_text} as audio.")
         return
 
     # Send audio and wait for twilio to play it
-    await audio_streaming_utils.send_audio_to_stream(
-        raw_audio_bytes=audio, websocket=websocket, stream_sid=stream_sid
+    await audio_streaming_utils.send_ulaw_frames_to_stream(
+        ulaw_frames=ulaw_frames, websocket=websocket, stream_sid=stream_sid
     )
 
     await audio_streaming_utils.send_mark_event_to_stream(
@@ -1,9 +1,10 @@
 """Submodule for human and AI conversation over a phone call."""
 
 import asyncio
+import functools
 import json
 import logging
-from collections import defaultdict
+import time
 
 import fastapi
 
@@ -13,105 +14,189 @@ from utils.speech_processing import (
     sarvam_ai_utils,
     voice_activity_detection,
 )
+from voice_assistant_modules import call_session
 from voice_assistant_modules.conversation_flows import base_conversation_flow
 
 SpeakerState = voice_activity_detection.SpeakerState
 
-# Mapping from phone number to ai thinking state.
-is_ai_thinking = defaultdict(bool)
 
-# Mapping from phone number to caller's listening state.
-is_client_listening_to_ai = defaultdict(bool)
+async def stream_ai_response(
+    websocket: fastapi.WebSocket,
+    session: call_session.CallSession,
+    raw_audio_bytes: bytes,
+    conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
+    speech_ended_at: float,
+):
+    """Streams ai response sentence by sentence as soon as it is spoken."""
+    scheduler = session.turn_scheduler
 
-# Mapping from phone number to conversation state.
-is_conversation_ended = defaultdict(bool)
+    # Send audio of each sentence to caller as soon as it is synthesised.
+    sent_sentences = []
+    try:
+        async for (
+            sentence,
+            sentence_audio,
+        ) in sarvam_ai_utils.speech_to_speech_stream(
+            raw_audio_bytes=raw_audio_bytes,
+            conversation_flow_handler=conversation_flow_handler,
+        ):
+            on_first_frame_sent = None
+            if not sent_sentences:
+                scheduler.start_playback()
+                on_first_frame_sent = functools.partial(
+                    scheduler.report_first_audio_sent,
+                    speech_ended_at=speech_ended_at,
+                )
+            sent_sentences.append(sentence)
+            await audio_streaming_utils.send_audio_frames_to_stream(
+                raw_audio_bytes=sentence_audio,
+                websocket=websocket,
+                stream_sid=session.stream_sid,
+                on_first_frame_sent=on_first_frame_sent,
+            )
+    finally:
+        # Add the sentences played to caller in chat history, even if the
+        # caller barged in before the rest of the response.
+        if sent_sentences:
+            conversation_flow_handler.add_ai_message(
+                text=" ".join(sent_sentences)
+            )
+    session.is_conversation_ended = (
+        conversation_flow_handler.is_conversation_ended()
+    )
 
-# Mapping from phone number to received speech chunks.
-client_audio_buffers = defaultdict(list)
+    if not sent_sentences:
+        scheduler.skip_ai_turn()
+        return
+
+    await audio_streaming_utils.send_mark_event_to_stream(
+        websocket=websocket,
+        stream_sid=session.stream_sid,
+    )
+
+
+async def respond_to_caller(
+    websocket: fastapi.WebSocket,
+    session: call_session.CallSession,
+    raw_audio_bytes: bytes,
+    conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
+    speech_ended_at: float,
+):
+    """Generates AI response for caller audio and plays it to the caller."""
+    scheduler = session.turn_scheduler
+    if voice_assistant_constants.STREAM_TTS_PLAYBACK:
+        await stream_ai_response(
+            websocket=websocket,
+            session=session,
+            raw_audio_bytes=raw_audio_bytes,
+            conversation_flow_handler=conversation_flow_handler,
+            speech_ended_at=speech_ended_at,
+        )
+        return
+
+    response = await sarvam_ai_utils.speech_to_speech(
+        raw_audio_bytes=raw_audio_bytes,
+        conversation_flow_handler=conversation_flow_handler,
+    )
+    if not response:
+        scheduler.skip_ai_turn()
+        return
+    ai_message, output_audio = response
+    session.is_conversation_ended = (
+        conversation_flow_handler.is_conversation_ended()
+    )
+
+    # Send generated audio audio back to caller
+    scheduler.start_playback()
+    try:
+        await audio_streaming_utils.send_audio_frames_to_stream(
+            raw_audio_bytes=output_audio,
+            websocket=websocket,
+            stream_sid=session.stream_sid,
+            on_first_frame_sent=functools.partial(
+                scheduler.report_first_audio_sent,
+                speech_ended_at=speech_ended_at,
+            ),
+        )
+    finally:
+        # Add ai message played to caller in chat history.
+        conversation_flow_handler.add_ai_message(text=ai_message)
+
+    await audio_streaming_utils.send_mark_event_to_stream(
+        websocket=websocket,
+        stream_sid=session.stream_sid,
+    )
 
 
 async def send_to_twilio(
     websocket: fastapi.WebSocket,
-    phone_number: str,
-    stream_id: str,
+    session: call_session.CallSession,
     conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
 ):
     """Processes received audio chunks and sends audio back to Twilio."""
+    scheduler = session.turn_scheduler
     try:
-        while True:
-            if is_conversation_ended[phone_number]:
+        while not session.is_conversation_ended:
+            # Wait until caller is idle after speaking.
+            speech_ended_at = await scheduler.wait_for_ai_turn()
+            if speech_ended_at is None:
                 break
 
-            # Do nothing when speaker is still speaking.
-            if not is_ai_thinking[phone_number]:
-                await asyncio.sleep(0.1)  # Sleep if inactive
-                continue
-
-            # Combine spoken audio chunks.
-            raw_audio_bytes = b"".join(client_audio_buffers[phone_number])
+            # Combine spoken audio chunks and reset buffer.
+            raw_audio_bytes = session.pop_caller_audio()
 
-            # Process speech if available and send audio response back
+            # Skip processing if not enough speech is available.
             if (
-                raw_audio_bytes
-                and len(raw_audio_bytes)
-                > voice_assistant_constants.SPEECH_PROCESSING_MIN_BYTES
+                len(raw_audio_bytes)
+                <= voice_assistant_constants.SPEECH_PROCESSING_MIN_BYTES
             ):
-                # Reset buffer
-                client_audio_buffers[phone_number] = []
+                scheduler.skip_ai_turn()
+                continue
 
-                # Generate AI audio response.
-                output_audio = sarvam_ai_utils.speech_to_speech(
+            # Generate AI audio response in a task which is cancelled if
+            # the caller barges in.
+            session.ai_turn_task = asyncio.create_task(
+                respond_to_caller(
+                    websocket=websocket,
+                    session=session,
                     raw_audio_bytes=raw_audio_bytes,
                     conversation_flow_handler=conversation_flow_handler,
+                    speech_ended_at=speech_ended_at,
                 )
-                if not output_audio:
-                    is_ai_thinking[phone_number] = False
-                    continue
-                is_conversation_ended[phone_number] = (
-                    conversation_flow_handler.is_conversation_ended()
-                )
-
-                # Send generated audio audio back to caller
-                await audio_streaming_utils.send_audio_to_stream(
-                    raw_audio_bytes=output_audio,
-                    websocket=websocket,
-                    stream_sid=stream_id,
-                )
-
-                await audio_streaming_utils.send_mark_event_to_stream(
-                    websocket=websocket,
-                    stream_sid=stream_id,
-                )
-
-                is_client_listening_to_ai[phone_number] = True
-
-            # If no audio is being played then mark ai as idle.
-            if not is_client_listening_to_ai[phone_number]:
-                is_ai_thinking[phone_number] = False
-
-            await asyncio.sleep(0.1)  # Sleep if inactive
+            )
+            await asyncio.wait({session.ai_turn_task})
+            if session.ai_turn_task.cancelled():
+                logging.info("Cancelled AI response interrupted by caller.")
+            else:
+                # Raise the error of AI turn, if any.
+                session.ai_turn_task.result()
+            session.ai_turn_task = None
 
     except Exception as e:
         logging.error(f"Error while sending audio to twilio : {e}")
 
 
+async def barge_in(
+    websocket: fastapi.WebSocket, session: call_session.CallSession
+):
+    """Stops AI response so that caller can speak over it."""
+    await audio_streaming_utils.send_clear_event_to_stream(
+        websocket=websocket, stream_sid=session.stream_sid
+    )
+    session.cancel_ai_turn()
+    session.turn_scheduler.interrupt_ai_turn()
+    session.barge_in_speech_sec = 0.0
+
+
 async def receive_from_twilio(
-    websocket: fastapi.WebSocket, phone_number: str, stream_id: str
+    websocket: fastapi.WebSocket, session: call_session.CallSession
 ):
     """Buffers incoming audio chunks and triggers processing on a pause."""
+    scheduler = session.turn_scheduler
     try:
-        # Initiate vad detector.
-        vad_detector = voice_activity_detection.VoiceActivityDetection(
-            rate=voice_assistant_constants.RATE,
-            vad_frames_per_buffer=voice_assistant_constants.VAD_FRAMES_PER_BUFFER,
-            bytes_per_sample=voice_assistant_constants.BYTES_PER_SAMPLE,
-            idle_time_trigger_sec=voice_assistant_constants.IDLE_TIME_TRIGGER_SEC,
-            chunk=voice_assistant_constants.CHUNK_LENGTH,
-            vad_mode=voice_assistant_constants.VAD_MODE,
-        )
-
+        speech_ended_at = time.perf_counter()
         async for message in websocket.iter_text():
-            if is_conversation_ended[phone_number]:
+            if session.is_conversation_ended:
                 return
             data = json.loads(message)
 
@@ -120,41 +205,67 @@ async def receive_from_twilio(
                 mark_tag = data["mark"]["name"]
                 if mark_tag == "ai-message":
                     logging.info(f"Received mark event with name: {mark_tag}.")
-                    is_ai_thinking[phone_number] = False
-                    is_client_listening_to_ai[phone_number] = False
+                    scheduler.finish_playback()
 
-            # Skip incoming media events when ai is processing last audio chunk
-            if is_ai_thinking[phone_number]:
+            # Skip incoming media events while ai prepares its response, so
+            # that caller can not interrupt a response not heard yet.
+            if scheduler.is_ai_thinking and not scheduler.is_playing:
                 continue
 
             # Buffer incoming audio chunk and detect if speech is paused.
             if data.get("event", None) == "media":
                 # Get audio chunk.
-                raw_audio_bytes = (
-                    audio_streaming_utils.convert_to_raw_audio_bytes(
-                        ulaw_audio=data["media"]["payload"]
-                    )
+                raw_audio = audio_streaming_utils.decode_ulaw_payload(
+                    ulaw_audio=data["media"]["payload"]
                 )
 
                 # Apply noise reduction.
-                smooth_audio = audio_streaming_utils.reduce_noise_from_audio(
-                    raw_audio_bytes=raw_audio_bytes
+                smooth_audio = session.denoiser.process(
+                    raw_audio_bytes=raw_audio
                 )
 
                 # Detect speaker activity
-                speaker_state: SpeakerState = vad_detector.detect_activity(
-                    audio_frame=smooth_audio, client_id=phone_number
+                speaker_state: SpeakerState = (
+                    session.vad_detector.detect_activity(
+                        audio_frame=smooth_audio
+                    )
                 )
 
+                # Let caller interrupt the AI response by speaking over it.
+                if scheduler.is_playing:
+                    if speaker_state != speaker_state.SPEAKING:
+                        session.discard_caller_audio()
+                        continue
+                    session.buffer_caller_audio(raw_audio_bytes=smooth_audio)
+                    session.barge_in_speech_sec += len(smooth_audio) / (
+                        voice_assistant_constants.RATE
+                        * voice_assistant_constants.BYTES_PER_SAMPLE
+                    )
+                    if session.vad_detector.is_voiced:
+                        speech_ended_at = time.perf_counter()
+                    if (
+                        session.barge_in_speech_sec
+                        >= voice_assistant_constants.BARGE_IN_MIN_SPEECH_SEC
+                    ):
+                        await barge_in(websocket=websocket, session=session)
+                    continue
+
                 if speaker_state == speaker_state.SPEAKING:
                     # Buffer incoming audio chunks when speaker is speaking.
-                    client_audio_buffers[phone_number].append(smooth_audio)
+                    session.buffer_caller_audio(raw_audio_bytes=smooth_audio)
+                    # Speech ends at the last voiced chunk, not at the end
+                    # of the hangover which follows it.
+                    if session.vad_detector.is_voiced:
+                        speech_ended_at = time.perf_counter()
                 elif speaker_state == speaker_state.IDLE_FOR_A_WHILE:
                     # Trigger speech processing if speaker is idle
                     logging.info("Speaker is idle. Processing audio.")
-                    is_ai_thinking[phone_number] = True
+                    scheduler.end_caller_turn(speech_ended_at=speech_ended_at)
     except Exception as e:
         logging.error(f"Error while receiving audio from twilio : {e}")
+    finally:
+        # Wake up the sender so that it does not wait for a turn forever.
+        scheduler.close()
 
 
 async def handle_media_stream(
@@ -164,15 +275,18 @@ async def handle_media_stream(
     conversation_flow_handler: base_conversation_flow.BaseConversationFlow,
 ):
     """Handles bidirectional media stream."""
-    await asyncio.gather(
-        receive_from_twilio(
-            websocket=websocket, phone_number=phone_number, stream_id=stream_id
-        ),
-        send_to_twilio(
-            websocket=websocket,
-            phone_number=phone_number,
-            stream_id=stream_id,
-            conversation_flow_handler=conversation_flow_handler,
-        ),
-        return_exceptions=True,
+    session = call_session.open_call_session(
+        stream_sid=stream_id, phone_number=phone_number
     )
+    try:
+        await asyncio.gather(
+            receive_from_twilio(websocket=websocket, session=session),
+            send_to_twilio(
+                websocket=websocket,
+                session=session,
+                conversation_flow_handler=conversation_flow_handler,
+            ),
+            return_exceptions=True,
+        )
+    finally:
+        call_session.close_call_session(stream_sid=stream_id)
@@ -0,0 +1,80 @@
+"""Submodule to schedule human and AI turns over a phone call."""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Optional
+
+from constants import voice_assistant_constants
+
+
+class TurnScheduler:
+    """Event driven scheduler handing turns between caller and AI."""
+
+    def __init__(self) -> None:
+        """Initialise the turn state of a call."""
+        # Queue of timestamps at which the caller stopped speaking.
+        self._pending_turns: asyncio.Queue[Optional[float]] = asyncio.Queue()
+        # Set when the caller is not listening to any AI audio.
+        self._playback_finished = asyncio.Event()
+        self._playback_finished.set()
+        self.is_ai_thinking = False
+        # Set while AI audio is played to the caller, who can barge in.
+        self.is_playing = False
+        # Latencies of the most recent turns.
+        self.turn_latencies_ms: collections.deque[float] = collections.deque(
+            maxlen=voice_assistant_constants.MAX_TRACKED_TURN_LATENCIES
+        )
+
+    def end_caller_turn(self, speech_ended_at: float):
+        """Hands the turn to AI once caller is idle for a while."""
+        if self.is_ai_thinking:
+            return
+        self.is_ai_thinking = True
+        self._pending_turns.put_nowait(speech_ended_at)
+
+    async def wait_for_ai_turn(self) -> Optional[float]:
+        """Waits for the caller to finish speaking.
+
+        Returns:
+            Timestamp at which caller stopped speaking or None if the call
+            is closed.
+        """
+        await self._playback_finished.wait()
+        return await self._pending_turns.get()
+
+    def start_playback(self):
+        """Marks that AI audio is being played to the caller."""
+        self._playback_finished.clear()
+        self.is_playing = True
+
+    def finish_playback(self):
+        """Hands the turn back to caller once AI audio is played."""
+        self._playback_finished.set()
+        self.is_ai_thinking = False
+        self.is_playing = False
+
+    def skip_ai_turn(self):
+        """Hands the turn back to caller when AI has nothing to say."""
+        self.is_ai_thinking = False
+        self.is_playing = False
+
+    def interrupt_ai_turn(self):
+        """Hands the turn back to caller when caller speaks over AI."""
+        logging.info("Caller interrupted the AI turn.")
+        self.finish_playback()
+
+    def close(self):
+        """Wakes up the waiting AI turn to end the call."""
+        self._playback_finished.set()
+        self._pending_turns.put_nowait(None)
+
+    def report_first_audio_sent(self, speech_ended_at: float) -> float:
+        """Records time from end of caller speech to first AI audio frame."""
+        latency = (time.perf_counter() - speech_ended_at) * 1000  # ms
+        self.turn_latencies_ms.append(latency)
+        logging.info(
+            f"Sent first audio frame {latency:.2f} ms after speech ended."
+        )
+        return latency